@@ -10,11 +10,21 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+from dotenv import load_dotenv
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# .env se lee una sola vez al arrancar; las vistas consultan settings
+# en lugar de re-parsear el archivo por petición
+load_dotenv()
+
+# Credencial de la API de Gemini (usada por los servicios de chat)
+GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY", "")
+
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.2/howto/deployment/checklist/
@@ -4,6 +4,8 @@ Incluye administración avanzada de archivos JSON y PDF.
 """
 
 from django.contrib import admin
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Length, Substr
 from django.utils.html import format_html
 from django.urls import reverse
 from django.utils.safestring import mark_safe
@@ -15,23 +17,51 @@ from myapp.models import (
     PDFDocument,
     FileVersion
 )
+from myapp.admin_paginator import FasterAdminPaginator
+from myapp.admin_helpers import DASH as _DASH, badge as _badge, format_file_size, tag_badges
+
+
+def _versions_count_subquery(content_type):
+    """Subconsulta con el número de versiones de cada objeto."""
+    return Coalesce(
+        Subquery(
+            FileVersion.objects.filter(
+                content_type=content_type,
+                object_id=OuterRef('pk')
+            ).values('object_id').annotate(c=Count('pk')).values('c')
+        ),
+        0,
+    )
 
 
 @admin.register(ChatMessage)
 class ChatMessageAdmin(admin.ModelAdmin):
     """Admin para mensajes de chat."""
+    paginator = FasterAdminPaginator
     list_display = ['id', 'session_key_short', 'role', 'content_preview', 'created_at']
     list_filter = ['role', 'created_at']
     search_fields = ['session_key', 'content']
     date_hierarchy = 'created_at'
     ordering = ['-created_at']
     
+    def get_queryset(self, request):
+        """La BD trunca los previews: menos bytes por fila y sin slicing en Python."""
+        return super().get_queryset(request).annotate(
+            _session_head=Substr('session_key', 1, 8),
+            _content_head=Substr('content', 1, 50),
+            _content_len=Length('content'),
+        )
+    
     def session_key_short(self, obj):
-        return obj.session_key[:8] + '...'
+        head = getattr(obj, '_session_head', None) or obj.session_key[:8]
+        return head + '...'
     session_key_short.short_description = 'Sesión'
     
     def content_preview(self, obj):
-        return obj.content[:50] + '...' if len(obj.content) > 50 else obj.content
+        head = getattr(obj, '_content_head', None)
+        if head is None:
+            return obj.content[:50] + '...' if len(obj.content) > 50 else obj.content
+        return head + '...' if obj._content_len > 50 else head
     content_preview.short_description = 'Contenido'
 
 
@@ -76,6 +106,8 @@ class JSONCorpusAdmin(admin.ModelAdmin):
     Incluye filtros, búsqueda, acciones en lote y visualización mejorada.
     """
     
+    paginator = FasterAdminPaginator
+    
     list_display = [
         'id',
         'name',
@@ -140,6 +172,12 @@ class JSONCorpusAdmin(admin.ModelAdmin):
         'create_backup_version',
     ]
     
+    def get_queryset(self, request):
+        """Anota el conteo de versiones para evitar una consulta por fila."""
+        return super().get_queryset(request).annotate(
+            _versions_count=_versions_count_subquery('json_corpus')
+        )
+    
     def corpus_type_badge(self, obj):
         """Muestra el tipo de corpus con color."""
         colors = {
@@ -149,12 +187,7 @@ class JSONCorpusAdmin(admin.ModelAdmin):
             'custom': '#ffc107',
         }
         color = colors.get(obj.corpus_type, '#6c757d')
-        return format_html(
-            '<span style="background-color: {}; color: white; padding: 3px 10px; '
-            'border-radius: 3px; font-size: 11px;">{}</span>',
-            color,
-            obj.get_corpus_type_display()
-        )
+        return _badge(color, obj.get_corpus_type_display())
     corpus_type_badge.short_description = 'Tipo'
     
     def status_badge(self, obj):
@@ -170,42 +203,60 @@ class JSONCorpusAdmin(admin.ModelAdmin):
     
     def file_size_display(self, obj):
         """Muestra el tamaño del archivo en formato legible."""
-        size_mb = obj.get_file_size_mb()
-        if size_mb < 1:
-            return f"{round(size_mb * 1024, 2)} KB"
-        return f"{size_mb} MB"
+        return format_file_size(obj.file_size_mb)
     file_size_display.short_description = 'Tamaño'
     
     def download_link(self, obj):
         """Enlace para descargar el archivo."""
-        try:
-            if obj.file and hasattr(obj.file, 'url') and obj.file.name:
-                return format_html(
-                    '<a href="{}" target="_blank" style="color: #007bff;">📥 Descargar</a>',
-                    obj.file.url
-                )
-        except (ValueError, AttributeError, Exception):
-            pass
-        return format_html('<span style="color: #999;">-</span>')
+        name = getattr(obj.file, 'name', None)
+        if not name:
+            return _DASH
+        return format_html(
+            '<a href="{}" target="_blank" style="color: #007bff;">📥 Descargar</a>',
+            obj.file.storage.url(name)
+        )
     download_link.short_description = 'Descarga'
     
     def file_preview(self, obj):
         """Vista previa del contenido JSON (primeros registros)."""
         if not obj.file:
             return format_html('<span style="color: #999;">No hay archivo</span>')
-        
+
         try:
             import json
-            with obj.file.open('r', encoding='utf-8') as f:
-                content = json.load(f)
-            
-            # Mostrar solo los primeros 3 elementos si es una lista
-            if isinstance(content, list):
-                preview = content[:3]
+            if obj.preview_json is not None:
+                # Vista previa precalculada al subir: sin abrir el archivo
+                preview = obj.preview_json
+            elif obj.compression:
+                # Corpus comprimido en reposo: el servicio sabe
+                # descomprimirlo; no se puede parsear el archivo en crudo
+                from myapp.services.file_manager_service import FileManagerService
+                content, error = FileManagerService.load_json_content(obj)
+                if error:
+                    raise ValueError(error)
+                preview = content[:3] if isinstance(content, list) else content
             else:
-                preview = content
-            
-            json_str = json.dumps(preview, indent=2, ensure_ascii=False)
+                try:
+                    # Parseo en streaming: lee solo los primeros registros
+                    # sin cargar el archivo completo en memoria
+                    import ijson
+                    preview = []
+                    with obj.file.open('rb') as f:
+                        for i, item in enumerate(ijson.items(f, 'item')):
+                            preview.append(item)
+                            if i >= 2:
+                                break
+                    if not preview:
+                        # No era una lista JSON: cargar el objeto completo
+                        with obj.file.open('r', encoding='utf-8') as f:
+                            preview = json.load(f)
+                except ImportError:
+                    with obj.file.open('r', encoding='utf-8') as f:
+                        content = json.load(f)
+                    # Mostrar solo los primeros 3 elementos si es una lista
+                    preview = content[:3] if isinstance(content, list) else content
+
+            json_str = json.dumps(preview, indent=2, ensure_ascii=False, default=str)
             
             return format_html(
                 '<pre style="background: #f8f9fa; padding: 10px; '
@@ -224,10 +275,12 @@ class JSONCorpusAdmin(admin.ModelAdmin):
         if not obj.pk:
             return format_html('<span style="color: #999;">Guarda primero para ver versiones</span>')
         
-        versions_count = FileVersion.objects.filter(
-            content_type='json_corpus',
-            object_id=obj.id
-        ).count()
+        versions_count = getattr(obj, '_versions_count', None)
+        if versions_count is None:
+            versions_count = FileVersion.objects.filter(
+                content_type='json_corpus',
+                object_id=obj.id
+            ).count()
         
         if versions_count > 0:
             return format_html(
@@ -256,17 +309,17 @@ class JSONCorpusAdmin(admin.ModelAdmin):
         """Crea versiones de backup de los corpus seleccionados."""
         from myapp.services.file_manager_service import FileManagerService
         
-        created = 0
-        for corpus in queryset:
-            version = FileManagerService._create_version_backup(
+        backups = [
+            FileManagerService._build_version_backup(
                 content_type='json_corpus',
                 object_id=corpus.id,
                 old_file=corpus.file,
                 version=corpus.version or 'backup',
                 description='Backup manual desde admin'
             )
-            if version:
-                created += 1
+            for corpus in queryset
+        ]
+        created = len(FileManagerService._persist_backups(backups))
         
         self.message_user(request, f'{created} backups creados.')
     create_backup_version.short_description = '💾 Crear backup de seleccionados'
@@ -278,7 +331,11 @@ class PDFDocumentAdmin(admin.ModelAdmin):
     Administración avanzada de documentos PDF.
     Incluye gestión de estado, versionado y metadatos.
     """
-    
+
+    paginator = FasterAdminPaginator
+
+    list_select_related = ['related_corpus']
+
     list_display = [
         'id',
         'title',
@@ -359,6 +416,12 @@ class PDFDocumentAdmin(admin.ModelAdmin):
         'create_backup_version',
     ]
     
+    def get_queryset(self, request):
+        """Anota el conteo de versiones para evitar una consulta por fila."""
+        return super().get_queryset(request).annotate(
+            _versions_count=_versions_count_subquery('pdf_document')
+        )
+    
     def document_type_badge(self, obj):
         """Badge para tipo de documento."""
         colors = {
@@ -370,12 +433,7 @@ class PDFDocumentAdmin(admin.ModelAdmin):
             'other': '#6c757d',
         }
         color = colors.get(obj.document_type, '#6c757d')
-        return format_html(
-            '<span style="background-color: {}; color: white; padding: 3px 10px; '
-            'border-radius: 3px; font-size: 11px;">{}</span>',
-            color,
-            obj.get_document_type_display()
-        )
+        return _badge(color, obj.get_document_type_display())
     document_type_badge.short_description = 'Tipo'
     
     def status_badge(self, obj):
@@ -386,12 +444,7 @@ class PDFDocumentAdmin(admin.ModelAdmin):
             'archived': '#ffc107',
         }
         color = colors.get(obj.status, '#6c757d')
-        return format_html(
-            '<span style="background-color: {}; color: white; padding: 3px 10px; '
-            'border-radius: 3px; font-size: 11px;">{}</span>',
-            color,
-            obj.get_status_display()
-        )
+        return _badge(color, obj.get_status_display())
     status_badge.short_description = 'Estado'
     
     def public_badge(self, obj):
@@ -403,35 +456,34 @@ class PDFDocumentAdmin(admin.ModelAdmin):
     
     def file_size_display(self, obj):
         """Tamaño del archivo en formato legible."""
-        size_mb = obj.get_file_size_mb()
-        if size_mb < 1:
-            return f"{round(size_mb * 1024, 2)} KB"
-        return f"{size_mb} MB"
+        return format_file_size(obj.file_size_mb)
     file_size_display.short_description = 'Tamaño'
     
     def download_link(self, obj):
         """Enlace de descarga."""
-        try:
-            if obj.file and hasattr(obj.file, 'url') and obj.file.name:
-                return format_html(
-                    '<a href="{}" target="_blank" style="color: #007bff;">📥 Descargar</a>',
-                    obj.file.url
-                )
-        except (ValueError, AttributeError, Exception):
-            pass
-        return format_html('<span style="color: #999;">-</span>')
+        name = getattr(obj.file, 'name', None)
+        if not name:
+            return _DASH
+        return format_html(
+            '<a href="{}" target="_blank" style="color: #007bff;">📥 Descargar</a>',
+            obj.file.storage.url(name)
+        )
     download_link.short_description = 'Descarga'
     
     def pdf_preview(self, obj):
         """Vista previa del PDF (info)."""
-        if not obj.file or not obj.file.name:
+        name = getattr(obj.file, 'name', None)
+        if not name:
             return format_html('<span style="color: #999;">No hay archivo</span>')
         
+        storage = obj.file.storage
+        file_url = storage.url(name)
+        # Solo los backends locales exponen una ruta en disco; en storages
+        # remotos (S3, etc.) evitamos cualquier round-trip adicional
         try:
-            file_url = obj.file.url
-            file_path = obj.file.path if hasattr(obj.file, 'path') else 'N/A'
-        except (ValueError, AttributeError, Exception) as e:
-            return format_html('<span style="color: red;">Archivo no disponible: {}</span>', str(e))
+            file_path = storage.path(name)
+        except NotImplementedError:
+            file_path = 'N/A'
         
         info = f"""
         <div style="background: #f8f9fa; padding: 15px; border-radius: 5px;">
@@ -447,16 +499,11 @@ class PDFDocumentAdmin(admin.ModelAdmin):
     
     def tags_display(self, obj):
         """Muestra las tags como badges."""
-        tags = obj.get_tags_list()
+        tags = obj.tags_list
         if not tags:
             return format_html('<span style="color: #999;">Sin etiquetas</span>')
         
-        badges = ''.join([
-            f'<span style="background: #e9ecef; padding: 3px 8px; margin: 2px; '
-            f'border-radius: 3px; display: inline-block; font-size: 11px;">{tag}</span>'
-            for tag in tags
-        ])
-        return mark_safe(badges)
+        return tag_badges(tags)
     tags_display.short_description = 'Etiquetas'
     
     def version_history_link(self, obj):
@@ -464,10 +511,12 @@ class PDFDocumentAdmin(admin.ModelAdmin):
         if not obj.pk:
             return format_html('<span style="color: #999;">Guarda primero para ver versiones</span>')
         
-        versions_count = FileVersion.objects.filter(
-            content_type='pdf_document',
-            object_id=obj.id
-        ).count()
+        versions_count = getattr(obj, '_versions_count', None)
+        if versions_count is None:
+            versions_count = FileVersion.objects.filter(
+                content_type='pdf_document',
+                object_id=obj.id
+            ).count()
         
         if versions_count > 0:
             return format_html(
@@ -515,17 +564,17 @@ class PDFDocumentAdmin(admin.ModelAdmin):
         """Crea versiones de backup."""
         from myapp.services.file_manager_service import FileManagerService
         
-        created = 0
-        for doc in queryset:
-            version = FileManagerService._create_version_backup(
+        backups = [
+            FileManagerService._build_version_backup(
                 content_type='pdf_document',
                 object_id=doc.id,
                 old_file=doc.file,
                 version=doc.version or 'backup',
                 description='Backup manual desde admin'
             )
-            if version:
-                created += 1
+            for doc in queryset
+        ]
+        created = len(FileManagerService._persist_backups(backups))
         
         self.message_user(request, f'{created} backups creados.')
     create_backup_version.short_description = '💾 Crear backup'
@@ -538,6 +587,8 @@ class FileVersionAdmin(admin.ModelAdmin):
     Permite ver y restaurar versiones anteriores.
     """
     
+    paginator = FasterAdminPaginator
+    
     list_display = [
         'id',
         'content_type_badge',
@@ -575,27 +626,19 @@ class FileVersionAdmin(admin.ModelAdmin):
     def content_type_badge(self, obj):
         """Badge para tipo de contenido."""
         if obj.content_type == 'json_corpus':
-            return format_html(
-                '<span style="background: #17a2b8; color: white; padding: 3px 10px; '
-                'border-radius: 3px;">📄 JSON</span>'
-            )
-        return format_html(
-            '<span style="background: #dc3545; color: white; padding: 3px 10px; '
-            'border-radius: 3px;">📕 PDF</span>'
-        )
+            return _badge('#17a2b8', '📄 JSON')
+        return _badge('#dc3545', '📕 PDF')
     content_type_badge.short_description = 'Tipo'
     
     def file_link(self, obj):
         """Enlace al archivo de backup."""
-        try:
-            if obj.file_backup and hasattr(obj.file_backup, 'url') and obj.file_backup.name:
-                return format_html(
-                    '<a href="{}" target="_blank">📥 Descargar</a>',
-                    obj.file_backup.url
-                )
-        except (ValueError, AttributeError, Exception):
-            pass
-        return format_html('<span style="color: #999;">-</span>')
+        name = getattr(obj.file_backup, 'name', None)
+        if not name:
+            return _DASH
+        return format_html(
+            '<a href="{}" target="_blank">📥 Descargar</a>',
+            obj.file_backup.storage.url(name)
+        )
     file_link.short_description = 'Archivo'
     
     def restore_button(self, obj):
@@ -0,0 +1,43 @@
+"""
+Helpers de renderizado para el panel de administración.
+Funciones puras con anotaciones de tipo estáticas, separadas de
+`admin.py` para poder compilarlas AOT (mypyc/Cython) si el tráfico
+del admin lo justifica.
+"""
+
+import functools
+
+from django.utils.html import escape
+from django.utils.safestring import SafeString, mark_safe
+
+# SafeString reutilizado para celdas sin archivo (evita format_html por fila)
+DASH: SafeString = mark_safe('<span style="color: #999;">-</span>')
+
+
+@functools.lru_cache(maxsize=64)
+def badge(color: str, label: str) -> SafeString:
+    """
+    Badge HTML de color memoizado.
+    Los changelists repiten los mismos pares (color, etiqueta) en cada
+    fila; cachear el SafeString evita re-formatear y re-escapar N veces.
+    """
+    return mark_safe(
+        f'<span style="background-color: {color}; color: white; padding: 3px 10px; '
+        f'border-radius: 3px; font-size: 11px;">{escape(label)}</span>'
+    )
+
+
+def format_file_size(size_mb: float) -> str:
+    """Formatea un tamaño en MB como texto legible (KB si es < 1 MB)."""
+    if size_mb < 1:
+        return f"{round(size_mb * 1024, 2)} KB"
+    return f"{size_mb} MB"
+
+
+def tag_badges(tags: list) -> SafeString:
+    """Renderiza una lista de etiquetas como badges grises."""
+    return mark_safe(''.join(
+        f'<span style="background: #e9ecef; padding: 3px 8px; margin: 2px; '
+        f'border-radius: 3px; display: inline-block; font-size: 11px;">{escape(tag)}</span>'
+        for tag in tags
+    ))
@@ -0,0 +1,44 @@
+"""
+Paginador optimizado para los changelists del admin de Django.
+Evita el COUNT(*) completo en tablas grandes usando la estimación
+de filas del catálogo de PostgreSQL cuando no hay filtros activos.
+"""
+
+from django.core.paginator import Paginator
+from django.db import connection
+from django.utils.functional import cached_property
+
+
+class FasterAdminPaginator(Paginator):
+    """
+    Paginador que estima el total de filas con ``pg_class.reltuples``
+    en lugar de ejecutar ``COUNT(*)`` sobre toda la tabla.
+
+    Solo aplica la estimación cuando:
+    - La base de datos es PostgreSQL.
+    - El queryset no tiene filtros (el changelist sin búsquedas).
+
+    En cualquier otro caso (SQLite en desarrollo, queryset filtrado)
+    delega en el conteo exacto de Django.
+    """
+
+    @cached_property
+    def count(self):
+        if (
+            connection.vendor == 'postgresql'
+            and hasattr(self.object_list, 'query')
+            and not self.object_list.query.where
+        ):
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        "SELECT reltuples::BIGINT FROM pg_class WHERE relname = %s",
+                        [self.object_list.query.model._meta.db_table],
+                    )
+                    estimate = cursor.fetchone()[0]
+                # reltuples es -1 en tablas nunca analizadas
+                if estimate is not None and estimate >= 0:
+                    return int(estimate)
+            except Exception as e:
+                print(f"⚠️ Error al estimar filas, usando COUNT exacto: {e}")
+        return super().count
@@ -4,6 +4,7 @@ Uso: python manage.py check_database
 """
 
 from django.core.management.base import BaseCommand
+from django.db.models import Count, Q
 from myapp.models import JSONCorpus, PDFDocument
 
 
@@ -13,7 +14,8 @@ class Command(BaseCommand):
     def handle(self, *args, **options):
         self.stdout.write(self.style.SUCCESS('=== CORPUS JSON ==='))
         
-        corpus_list = JSONCorpus.objects.all()
+        # Evaluar los querysets una sola vez para reutilizarlos en el resumen
+        corpus_list = list(JSONCorpus.objects.all())
         if corpus_list:
             for c in corpus_list:
                 status = "✓ Activo" if c.is_active else "✗ Inactivo"
@@ -27,7 +29,7 @@ class Command(BaseCommand):
         
         self.stdout.write(self.style.SUCCESS('=== DOCUMENTOS PDF ==='))
         
-        pdf_list = PDFDocument.objects.all()
+        pdf_list = list(PDFDocument.objects.all())
         if pdf_list:
             for p in pdf_list:
                 has_file = "✓" if p.file else "✗"
@@ -43,8 +45,15 @@ class Command(BaseCommand):
         else:
             self.stdout.write(self.style.WARNING('  No hay documentos PDF en la base de datos\n'))
         
+        # Una sola consulta agregada en lugar de varios COUNT por separado
+        pdf_stats = PDFDocument.objects.aggregate(
+            total=Count('id'),
+            with_file=Count('id', filter=~Q(file='') & Q(file__isnull=False)),
+            without_file=Count('id', filter=Q(file='') | Q(file__isnull=True)),
+        )
+
         self.stdout.write(self.style.SUCCESS(f'\n=== RESUMEN ==='))
-        self.stdout.write(f'Total Corpus JSON: {corpus_list.count()}')
-        self.stdout.write(f'Total Documentos PDF: {pdf_list.count()}')
-        self.stdout.write(f'PDFs con archivo: {pdf_list.filter(file__isnull=False).exclude(file="").count()}')
-        self.stdout.write(f'PDFs sin archivo: {pdf_list.filter(file="").count() + pdf_list.filter(file__isnull=True).count()}')
+        self.stdout.write(f'Total Corpus JSON: {len(corpus_list)}')
+        self.stdout.write(f'Total Documentos PDF: {pdf_stats["total"]}')
+        self.stdout.write(f'PDFs con archivo: {pdf_stats["with_file"]}')
+        self.stdout.write(f'PDFs sin archivo: {pdf_stats["without_file"]}')
@@ -7,9 +7,18 @@ Uso:
     
 Para ejecutar automáticamente cada hora, agregar a cron o Windows Task Scheduler:
     python manage.py cleanup_old_sessions >> logs/cleanup.log 2>&1
+
+Rendimiento: las dos rutas calientes del comando están cubiertas por
+índices de ChatMessage: el GROUP BY con Max(created_at) usa el índice
+compuesto (session_key, -created_at) ('chatmsg_sess_created_idx') y el
+filtro por fecha límite usa el índice simple de created_at. En
+PostgreSQL, un índice BRIN sobre created_at sería una mejora adicional
+para tablas muy grandes, pero requiere django.contrib.postgres y no es
+portable a la base SQLite de desarrollo.
 """
 
 from django.core.management.base import BaseCommand
+from django.db import transaction
 from django.utils import timezone
 from datetime import timedelta
 from myapp.models import ChatMessage
@@ -63,9 +72,10 @@ class Command(BaseCommand):
             ))
             return
         
-        # Contar mensajes a eliminar
-        session_keys = [s['session_key'] for s in sessions_with_last_message]
-        total_messages = ChatMessage.objects.filter(session_key__in=session_keys).count()
+        # Subconsulta con las sesiones caducadas: evita materializar
+        # todas las claves en Python y enviarlas en un IN gigante
+        stale_keys = sessions_with_last_message.values('session_key')
+        total_messages = ChatMessage.objects.filter(session_key__in=stale_keys).count()
         
         self.stdout.write(f"Sesiones a limpiar: {total_sessions}")
         self.stdout.write(f"Mensajes a eliminar: {total_messages}")
@@ -82,10 +92,17 @@ class Command(BaseCommand):
             if total_sessions > 10:
                 self.stdout.write(f"  ... y {total_sessions - 10} sesiones más")
         else:
-            # Eliminar mensajes
-            deleted_count, _ = ChatMessage.objects.filter(
-                session_key__in=session_keys
-            ).delete()
+            # Eliminar en lotes acotados: evita que el recolector de borrado
+            # materialice todos los IDs y mantiene transacciones cortas
+            stale_messages = ChatMessage.objects.filter(session_key__in=stale_keys)
+            deleted_count = 0
+            while True:
+                ids = list(stale_messages.values_list('id', flat=True)[:5000])
+                if not ids:
+                    break
+                with transaction.atomic():
+                    batch_deleted, _ = ChatMessage.objects.filter(id__in=ids).delete()
+                deleted_count += batch_deleted
             
             self.stdout.write(self.style.SUCCESS(
                 f"\n✓ Limpieza completada:"
@@ -9,6 +9,43 @@ Los archivos PDF reales deben agregarse manualmente desde el admin de Django.
 from django.core.management.base import BaseCommand
 from myapp.models import PDFDocument, JSONCorpus
 
+# Registros de ejemplo definidos a nivel de módulo: se construyen una
+# sola vez al importar en lugar de en cada invocación del comando
+_SAMPLE_PDF_RECORDS = (
+    {
+        'title': 'Guía de Becas UTPL 2024',
+        'document_type': 'guide',
+        'description': 'Guía completa sobre las becas disponibles en la UTPL, requisitos y proceso de solicitud',
+        'version': '1.0',
+        'tags': 'becas,utpl,guía,estudiantes,2024',
+        'status': 'draft',
+    },
+    {
+        'title': 'Reglamento de Becas UTPL',
+        'document_type': 'regulations',
+        'description': 'Reglamento oficial que regula el sistema de becas de la UTPL',
+        'version': '2024',
+        'tags': 'becas,reglamento,normativa,utpl',
+        'status': 'draft',
+    },
+    {
+        'title': 'Preguntas Frecuentes - Becas UTPL',
+        'document_type': 'guide',
+        'description': 'Respuestas a las preguntas más comunes sobre el sistema de becas UTPL',
+        'version': '1.0',
+        'tags': 'becas,faq,preguntas,respuestas,ayuda',
+        'status': 'draft',
+    },
+    {
+        'title': 'Formulario de Solicitud de Beca',
+        'document_type': 'form',
+        'description': 'Formulario oficial para solicitar becas en la UTPL',
+        'version': '2024-1',
+        'tags': 'becas,formulario,solicitud',
+        'status': 'draft',
+    },
+)
+
 
 class Command(BaseCommand):
     help = 'Crea registros de documentos PDF de ejemplo para el sistema'
@@ -16,11 +53,14 @@ class Command(BaseCommand):
     def handle(self, *args, **options):
         self.stdout.write(self.style.SUCCESS('=== Creando registros de PDFs de ejemplo ===\n'))
         
-        # Obtener el corpus relacionado
-        related_corpus = JSONCorpus.objects.filter(name='corpus_becas_utpl').first()
+        # Solo se necesita el PK del corpus: evitar traer la fila completa
+        # (descripción TEXT y metadatos del FileField incluidos)
+        related_corpus_id = JSONCorpus.objects.filter(
+            name='corpus_becas_utpl'
+        ).values_list('id', flat=True).first()
         
         # Crear registros de ejemplo (sin archivos)
-        self.create_sample_records(related_corpus)
+        self.create_sample_records(related_corpus_id)
         
         self.stdout.write(self.style.SUCCESS('\n=== Registros creados ==='))
         self.stdout.write(self.style.NOTICE('\nℹ Para agregar archivos PDF reales:'))
@@ -28,68 +68,41 @@ class Command(BaseCommand):
         self.stdout.write('  2. Ve a "Documentos PDF"')
         self.stdout.write('  3. Edita cada registro y sube el archivo PDF correspondiente')
 
-    def create_sample_records(self, related_corpus):
+    def create_sample_records(self, related_corpus_id):
         """Crea registros de ejemplo de documentos PDF."""
         
-        samples = [
-            {
-                'title': 'Guía de Becas UTPL 2024',
-                'document_type': 'guide',
-                'description': 'Guía completa sobre las becas disponibles en la UTPL, requisitos y proceso de solicitud',
-                'version': '1.0',
-                'tags': 'becas,utpl,guía,estudiantes,2024',
-                'status': 'draft',
-            },
-            {
-                'title': 'Reglamento de Becas UTPL',
-                'document_type': 'regulations',
-                'description': 'Reglamento oficial que regula el sistema de becas de la UTPL',
-                'version': '2024',
-                'tags': 'becas,reglamento,normativa,utpl',
-                'status': 'draft',
-            },
-            {
-                'title': 'Preguntas Frecuentes - Becas UTPL',
-                'document_type': 'guide',
-                'description': 'Respuestas a las preguntas más comunes sobre el sistema de becas UTPL',
-                'version': '1.0',
-                'tags': 'becas,faq,preguntas,respuestas,ayuda',
-                'status': 'draft',
-            },
-            {
-                'title': 'Formulario de Solicitud de Beca',
-                'document_type': 'form',
-                'description': 'Formulario oficial para solicitar becas en la UTPL',
-                'version': '2024-1',
-                'tags': 'becas,formulario,solicitud',
-                'status': 'draft',
-            },
-        ]
+        samples = _SAMPLE_PDF_RECORDS
         
-        created_count = 0
+        # Una sola consulta resuelve los títulos existentes en un dict
+        # (membresía O(1); in_bulk(field_name='title') exigiría que el
+        # campo fuera unique, así que se construye el dict a mano)
+        existing = dict(
+            PDFDocument.objects.filter(
+                title__in=[sample['title'] for sample in samples]
+            ).values_list('title', 'id')
+        )
+
+        new_documents = []
         for sample in samples:
-            # Verificar si ya existe
-            if PDFDocument.objects.filter(title=sample['title']).exists():
+            if sample['title'] in existing:
                 self.stdout.write(self.style.WARNING(f"  ⚠ Ya existe: {sample['title']}"))
                 continue
-            
-            # Crear registro
-            document = PDFDocument(
-                title=sample['title'],
-                document_type=sample['document_type'],
-                description=sample['description'],
-                version=sample['version'],
-                tags=sample['tags'],
-                status=sample['status'],
+
+            new_documents.append(PDFDocument(
+                **sample,
                 is_public=False,
-                related_corpus=related_corpus,
+                related_corpus_id=related_corpus_id,
                 created_by='Sistema'
-            )
-            document.save()
-            
-            self.stdout.write(self.style.SUCCESS(f"  ✓ Creado: {sample['title']}"))
-            created_count += 1
-        
+            ))
+
+        # Un solo INSERT multi-fila; ignore_conflicts cubre la carrera
+        # entre la consulta de existencia y la inserción
+        PDFDocument.objects.bulk_create(new_documents, batch_size=100, ignore_conflicts=True)
+        created_count = len(new_documents)
+
+        for document in new_documents:
+            self.stdout.write(self.style.SUCCESS(f"  ✓ Creado: {document.title}"))
+
         if created_count > 0:
             self.stdout.write(self.style.SUCCESS(f'\n  Total registros creados: {created_count}'))
         else:
@@ -3,9 +3,15 @@ Comando de Django para poblar la base de datos con datos iniciales.
 Uso: python manage.py populate_initial_data
 """
 
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
 from django.core.management.base import BaseCommand
 from django.core.files import File
+from django.core.files.base import ContentFile
+from django.db.models.functions import Lower
 from myapp.models import JSONCorpus, PDFDocument
+from pypdf import PdfReader
 import os
 import json
 from pathlib import Path
@@ -53,10 +59,25 @@ class Command(BaseCommand):
             self.stdout.write(self.style.WARNING(f'  ⚠ Ya existe corpus "{corpus_name}". Use --force para recargar.'))
             return
         
-        # Leer el archivo para contar registros
+        # Contar registros: orjson (parseo en C) es lo más rápido, pero
+        # materializa todo el documento en memoria. Por encima del umbral
+        # configurado se cambia a ijson, que itera en streaming con
+        # memoria O(1) a costa de velocidad.
+        stream_threshold_mb = getattr(settings, 'CORPUS_STREAM_THRESHOLD_MB', 100)
         try:
-            with open(json_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            file_size_mb = json_path.stat().st_size / (1024 * 1024)
+            if file_size_mb > stream_threshold_mb:
+                import ijson
+                with open(json_path, 'rb') as f:
+                    records_count = sum(1 for _ in ijson.items(f, 'item'))
+                raw = None
+            else:
+                raw = json_path.read_bytes()
+                try:
+                    import orjson
+                    data = orjson.loads(raw)
+                except ImportError:
+                    data = json.loads(raw)
                 records_count = len(data) if isinstance(data, list) else len(data.get('data', []))
         except Exception as e:
             self.stdout.write(self.style.ERROR(f'  ✗ Error al leer JSON: {e}'))
@@ -67,19 +88,23 @@ class Command(BaseCommand):
             self.stdout.write(f'  → Eliminando corpus existente...')
             existing.delete()
         
-        # Crear nuevo corpus
+        # Crear nuevo corpus reutilizando los bytes ya leídos para el conteo
+        # cuando caben en memoria; en la ruta streaming se abre el archivo
         try:
-            with open(json_path, 'rb') as f:
-                corpus = JSONCorpus(
-                    name=corpus_name,
-                    corpus_type='becas',
-                    description='Corpus de datos de becas UTPL extraído mediante web scraping',
-                    version='1.0',
-                    is_active=True,
-                    records_count=records_count,
-                    created_by='Sistema'
-                )
-                corpus.file.save('corpus_utpl.json', File(f), save=True)
+            corpus = JSONCorpus(
+                name=corpus_name,
+                corpus_type='becas',
+                description='Corpus de datos de becas UTPL extraído mediante web scraping',
+                version='1.0',
+                is_active=True,
+                records_count=records_count,
+                created_by='Sistema'
+            )
+            if raw is not None:
+                corpus.file.save('corpus_utpl.json', ContentFile(raw), save=True)
+            else:
+                with open(json_path, 'rb') as f:
+                    corpus.file.save('corpus_utpl.json', File(f), save=True)
             
             self.stdout.write(self.style.SUCCESS(
                 f'  ✓ Corpus cargado: {corpus.name} ({records_count} registros, {corpus.get_file_size_mb()} MB)'
@@ -106,44 +131,90 @@ class Command(BaseCommand):
             self.stdout.write(self.style.NOTICE('  ℹ Puedes agregar PDFs manualmente desde el admin de Django'))
             return
         
-        # Obtener el corpus relacionado (opcional)
-        related_corpus = JSONCorpus.objects.filter(name='corpus_becas_utpl').first()
-        
-        loaded_count = 0
-        for pdf_path in pdf_files:
-            # Verificar si ya existe
-            doc_title = pdf_path.stem.replace('_', ' ').title()
-            existing = PDFDocument.objects.filter(title=doc_title).first()
-            
+        # Obtener solo el PK del corpus relacionado (opcional): la fila
+        # completa no se usa y su descripción/archivo viajan de más
+        related_corpus_id = JSONCorpus.objects.filter(
+            name='corpus_becas_utpl'
+        ).values_list('id', flat=True).first()
+        
+        # Resolver existencia con una sola consulta IN en lugar de un
+        # SELECT por archivo; la comparación ignora mayúsculas/minúsculas
+        # y aprovecha el índice funcional lower(title)
+        titles = {pdf_path.stem.replace('_', ' ').title(): pdf_path for pdf_path in pdf_files}
+        existing_docs = {
+            doc.title.lower(): doc
+            for doc in PDFDocument.objects.annotate(
+                title_lower=Lower('title')
+            ).filter(title_lower__in=[t.lower() for t in titles])
+        }
+        
+        to_ingest = []
+        for doc_title, pdf_path in titles.items():
+            existing = existing_docs.get(doc_title.lower())
+
             if existing and not force:
                 self.stdout.write(self.style.WARNING(f'  ⚠ Ya existe: {doc_title}'))
                 continue
-            
-            # Eliminar si existe y force=True
+
+            # Eliminar si existe y force=True (delete() del modelo también
+            # borra el archivo físico, por eso no se usa un delete masivo)
             if existing and force:
                 existing.delete()
-            
-            # Crear documento
+
+            to_ingest.append((doc_title, pdf_path))
+
+        def _ingest(args):
+            """Sube un PDF al storage y retorna el modelo sin persistir."""
+            doc_title, pdf_path = args
             try:
                 with open(pdf_path, 'rb') as f:
+                    # Contar páginas leyendo solo el xref/trailer del PDF,
+                    # para no dejar page_count en 0 y forzar un re-parseo futuro
+                    try:
+                        page_count = len(PdfReader(f, strict=False).pages)
+                    except Exception:
+                        page_count = 0
+                    f.seek(0)
+                    
                     document = PDFDocument(
                         title=doc_title,
                         document_type='guide',
                         description=f'Documento importado automáticamente desde {pdf_path.name}',
                         status='published',
                         is_public=True,
-                        related_corpus=related_corpus,
+                        page_count=page_count,
+                        related_corpus_id=related_corpus_id,
                         created_by='Sistema'
                     )
-                    document.file.save(pdf_path.name, File(f), save=True)
-                
+                    document.file.save(pdf_path.name, File(f), save=False)
+                # bulk_create no pasa por save(): fijar el tamaño aquí
+                document.file_size = document.file.size
+                return document, None
+            except Exception as e:
+                return None, f'Error al cargar {pdf_path.name}: {e}'
+
+        # Las subidas son independientes y están limitadas por I/O:
+        # paralelizar con hilos y finalizar con un solo INSERT multi-fila
+        loaded_count = 0
+        if to_ingest:
+            with ThreadPoolExecutor(max_workers=min(8, len(to_ingest))) as executor:
+                results = list(executor.map(_ingest, to_ingest))
+
+            new_documents = []
+            for document, error in results:
+                if document:
+                    new_documents.append(document)
+                else:
+                    self.stdout.write(self.style.ERROR(f'  ✗ {error}'))
+
+            PDFDocument.objects.bulk_create(new_documents, batch_size=100)
+            loaded_count = len(new_documents)
+
+            for document in new_documents:
                 self.stdout.write(self.style.SUCCESS(
                     f'  ✓ PDF cargado: {document.title} ({document.get_file_size_mb()} MB)'
                 ))
-                loaded_count += 1
-            except Exception as e:
-                self.stdout.write(self.style.ERROR(f'  ✗ Error al cargar {pdf_path.name}: {e}'))
-        
+
         if loaded_count == 0 and not pdf_files:
             self.stdout.write(self.style.NOTICE('  ℹ No hay archivos PDF para cargar'))
         elif loaded_count > 0:
@@ -0,0 +1,18 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("myapp", "0002_alter_uploadeddocument_options_fileversion_and_more"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="chatmessage",
+            index=models.Index(
+                fields=["session_key", "-created_at"],
+                name="chatmsg_sess_created_idx",
+            ),
+        ),
+    ]
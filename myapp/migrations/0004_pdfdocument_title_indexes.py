@@ -0,0 +1,25 @@
+from django.db import migrations, models
+from django.db.models.functions import Lower
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("myapp", "0003_chatmessage_session_created_idx"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="pdfdocument",
+            name="title",
+            field=models.CharField(
+                db_index=True,
+                help_text="Título del documento",
+                max_length=250,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="pdfdocument",
+            index=models.Index(Lower("title"), name="pdfdoc_title_lower"),
+        ),
+    ]
@@ -0,0 +1,28 @@
+import django.core.validators
+from django.db import migrations, models
+
+import myapp.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("myapp", "0004_pdfdocument_title_indexes"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="pdfdocument",
+            name="file",
+            field=models.FileField(
+                help_text="Archivo PDF",
+                upload_to="documents_pdf/%Y/%m/",
+                validators=[
+                    django.core.validators.FileExtensionValidator(
+                        allowed_extensions=["pdf"]
+                    ),
+                    myapp.models.validate_pdf_magic,
+                ],
+            ),
+        ),
+    ]
@@ -0,0 +1,36 @@
+from django.db import migrations, models
+
+
+def backfill_session_key_hash(apps, schema_editor):
+    from myapp.models import hash_session_key
+
+    ChatMessage = apps.get_model("myapp", "ChatMessage")
+    batch = []
+    for message in ChatMessage.objects.filter(session_key_hash=0).iterator(chunk_size=2000):
+        message.session_key_hash = hash_session_key(message.session_key)
+        batch.append(message)
+        if len(batch) >= 2000:
+            ChatMessage.objects.bulk_update(batch, ["session_key_hash"])
+            batch = []
+    if batch:
+        ChatMessage.objects.bulk_update(batch, ["session_key_hash"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("myapp", "0005_pdfdocument_file_magic_validator"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="chatmessage",
+            name="session_key_hash",
+            field=models.BigIntegerField(
+                db_index=True,
+                default=0,
+                help_text="Hash de 64 bits de session_key (índice compacto para búsquedas)",
+            ),
+        ),
+        migrations.RunPython(backfill_session_key_hash, migrations.RunPython.noop),
+    ]
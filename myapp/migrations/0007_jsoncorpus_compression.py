@@ -0,0 +1,21 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("myapp", "0006_chatmessage_session_key_hash"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="jsoncorpus",
+            name="compression",
+            field=models.CharField(
+                blank=True,
+                default="",
+                help_text="Compresión del archivo en reposo ('zstd' o vacío)",
+                max_length=10,
+            ),
+        ),
+    ]
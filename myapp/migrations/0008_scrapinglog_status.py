@@ -0,0 +1,34 @@
+from django.db import migrations, models
+
+
+def backfill_status(apps, schema_editor):
+    """Los registros históricos ya terminaron: su estado se deriva de success."""
+    ScrapingLog = apps.get_model("myapp", "ScrapingLog")
+    ScrapingLog.objects.filter(success=True).update(status="success")
+    ScrapingLog.objects.filter(success=False).update(status="error")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("myapp", "0007_jsoncorpus_compression"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="scrapinglog",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("pending", "Pendiente"),
+                    ("running", "En ejecución"),
+                    ("success", "Exitoso"),
+                    ("error", "Fallido"),
+                ],
+                default="pending",
+                help_text="Estado de la ejecución (las tareas corren en segundo plano)",
+                max_length=10,
+            ),
+        ),
+        migrations.RunPython(backfill_status, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("myapp", "0008_scrapinglog_status"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="jsoncorpus",
+            index=models.Index(
+                fields=["is_active", "-created_at"],
+                name="corpus_active_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="pdfdocument",
+            index=models.Index(
+                fields=["is_public", "-created_at"],
+                name="pdf_public_created_idx",
+            ),
+        ),
+    ]
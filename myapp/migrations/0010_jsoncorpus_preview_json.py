@@ -0,0 +1,20 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("myapp", "0009_listing_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="jsoncorpus",
+            name="preview_json",
+            field=models.JSONField(
+                blank=True,
+                help_text="Primeros registros precalculados para la vista previa",
+                null=True,
+            ),
+        ),
+    ]
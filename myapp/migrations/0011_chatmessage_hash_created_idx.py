@@ -0,0 +1,18 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("myapp", "0010_jsoncorpus_preview_json"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="chatmessage",
+            index=models.Index(
+                fields=["session_key_hash", "created_at"],
+                name="chatmsg_hash_created_idx",
+            ),
+        ),
+    ]
@@ -3,12 +3,39 @@ Modelos de Django para BecaBot UTPL.
 Almacena conversaciones, documentos y archivos del sistema.
 """
 
+import hashlib
+
+from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models.functions import Lower
 from django.utils import timezone
+from django.utils.functional import cached_property
 from django.core.validators import FileExtensionValidator
 import os
 
 
+def hash_session_key(session_key):
+    """
+    Hash determinista de 64 bits de una clave de sesión.
+    Un BIGINT indexado ocupa ~8 bytes por entrada frente a ~40 del texto,
+    y las comparaciones son de enteros en lugar de cadenas.
+    """
+    digest = hashlib.blake2b(session_key.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big') - 2**63
+
+
+def validate_pdf_magic(file):
+    """
+    Valida que el archivo sea realmente un PDF leyendo su cabecera.
+    Rechaza archivos renombrados antes de escribirlos a disco, evitando
+    una verificación posterior que tendría que releer el archivo completo.
+    """
+    head = file.read(5)
+    file.seek(0)
+    if head != b'%PDF-':
+        raise ValidationError('El archivo no es un PDF válido (falta la cabecera %PDF-).')
+
+
 class ChatMessage(models.Model):
     """
     Modelo para almacenar mensajes del chat.
@@ -24,6 +51,11 @@ class ChatMessage(models.Model):
         db_index=True,
         help_text="Identificador de sesión del usuario"
     )
+    session_key_hash = models.BigIntegerField(
+        default=0,
+        db_index=True,
+        help_text="Hash de 64 bits de session_key (índice compacto para búsquedas)"
+    )
     role = models.CharField(
         max_length=10,
         choices=ROLE_CHOICES,
@@ -44,11 +76,43 @@ class ChatMessage(models.Model):
         verbose_name_plural = "Mensajes de Chat"
         indexes = [
             models.Index(fields=['session_key', 'created_at']),
+            # Acelera la detección de sesiones caducadas en cleanup_old_sessions:
+            # el GROUP BY session_key con Max(created_at) se resuelve con el índice
+            models.Index(fields=['session_key', '-created_at'], name='chatmsg_sess_created_idx'),
+            # Historial y borrado de una sesión (for_session + order_by
+            # created_at): rango de índice sin paso de ordenación
+            models.Index(fields=['session_key_hash', 'created_at'],
+                         name='chatmsg_hash_created_idx'),
         ]
-    
+
     def __str__(self):
         return f"{self.get_role_display()}: {self.content[:50]}..."
 
+    def save(self, *args, **kwargs):
+        """Calcula el hash de sesión si aún no está fijado."""
+        if not self.session_key_hash and self.session_key:
+            self.session_key_hash = hash_session_key(self.session_key)
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def for_session(cls, session_key):
+        """QuerySet de los mensajes de una sesión, filtrado por el hash."""
+        return cls.objects.filter(session_key_hash=hash_session_key(session_key))
+
+    @classmethod
+    def log_turn(cls, session_key, question, answer):
+        """
+        Persiste un turno completo (pregunta y respuesta) en un solo
+        INSERT multi-fila en lugar de dos escrituras separadas.
+        """
+        key_hash = hash_session_key(session_key)
+        return cls.objects.bulk_create([
+            cls(session_key=session_key, session_key_hash=key_hash,
+                role='human', content=question),
+            cls(session_key=session_key, session_key_hash=key_hash,
+                role='ai', content=answer),
+        ])
+
 
 class UploadedDocument(models.Model):
     """
@@ -91,6 +155,14 @@ class ScrapingLog(models.Model):
     """
     Modelo para registrar ejecuciones del web scraper.
     """
+    
+    STATUS_CHOICES = [
+        ('pending', 'Pendiente'),
+        ('running', 'En ejecución'),
+        ('success', 'Exitoso'),
+        ('error', 'Fallido'),
+    ]
+    
     executed_at = models.DateTimeField(
         default=timezone.now,
         db_index=True,
@@ -109,6 +181,12 @@ class ScrapingLog(models.Model):
         null=True,
         help_text="Mensaje de error si falló"
     )
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default='pending',
+        help_text="Estado de la ejecución (las tareas corren en segundo plano)"
+    )
     
     class Meta:
         ordering = ['-executed_at']
@@ -116,8 +194,7 @@ class ScrapingLog(models.Model):
         verbose_name_plural = "Logs de Scraping"
     
     def __str__(self):
-        status = "Exitoso" if self.success else "Fallido"
-        return f"{status} - {self.executed_at.strftime('%Y-%m-%d %H:%M')}"
+        return f"{self.get_status_display()} - {self.executed_at.strftime('%Y-%m-%d %H:%M')}"
 
 
 # ============================================================================
@@ -170,6 +247,17 @@ class JSONCorpus(models.Model):
         default=0,
         help_text="Número de registros en el corpus"
     )
+    compression = models.CharField(
+        max_length=10,
+        blank=True,
+        default='',
+        help_text="Compresión del archivo en reposo ('zstd' o vacío)"
+    )
+    preview_json = models.JSONField(
+        null=True,
+        blank=True,
+        help_text="Primeros registros precalculados para la vista previa"
+    )
     file_size = models.BigIntegerField(
         default=0,
         help_text="Tamaño del archivo en bytes"
@@ -195,28 +283,54 @@ class JSONCorpus(models.Model):
         indexes = [
             models.Index(fields=['corpus_type', 'is_active']),
             models.Index(fields=['-created_at']),
+            # Listado de admin filtrado por estado y ordenado por fecha:
+            # se resuelve como condición de índice pura
+            models.Index(fields=['is_active', '-created_at'],
+                         name='corpus_active_created_idx'),
         ]
     
     def __str__(self):
         status = "✓" if self.is_active else "✗"
         return f"{status} {self.name} ({self.get_corpus_type_display()})"
     
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Nombre del archivo al cargar la instancia: permite saltarse el
+        # stat/HEAD de file.size cuando el archivo no cambió
+        self._original_file_name = self.file.name if self.file else None
+
     def save(self, *args, **kwargs):
         """Guarda metadatos automáticamente."""
-        if self.file:
+        update_fields = kwargs.get('update_fields')
+        # Con update_fields sin 'file' el archivo no pudo cambiar:
+        # ni stat/HEAD ni columna file_size en el UPDATE
+        if (update_fields is None or 'file' in update_fields) and self.file and (
+            self._state.adding or self.file.name != self._original_file_name
+        ):
             self.file_size = self.file.size
+            if update_fields is not None and 'file_size' not in update_fields:
+                kwargs['update_fields'] = list(update_fields) + ['file_size']
         super().save(*args, **kwargs)
+        self._original_file_name = self.file.name if self.file else None
     
+    @cached_property
+    def file_size_mb(self):
+        """Tamaño del archivo en MB, calculado una sola vez por instancia."""
+        return round(self.file_size / (1024 * 1024), 2)
+
     def get_file_size_mb(self):
         """Retorna el tamaño del archivo en MB."""
-        return round(self.file_size / (1024 * 1024), 2)
+        return self.file_size_mb
     
     def delete(self, *args, **kwargs):
         """Elimina el archivo físico al borrar el registro."""
-        if self.file:
-            if os.path.isfile(self.file.path):
-                os.remove(self.file.path)
+        file_name = self.file.name if self.file else None
+        storage = self.file.storage if file_name else None
         super().delete(*args, **kwargs)
+        # El storage API ignora archivos inexistentes y funciona también
+        # con backends remotos (sin os.path sobre rutas locales)
+        if file_name:
+            storage.delete(file_name)
 
 
 class PDFDocument(models.Model):
@@ -242,6 +356,7 @@ class PDFDocument(models.Model):
     
     title = models.CharField(
         max_length=250,
+        db_index=True,
         help_text="Título del documento"
     )
     document_type = models.CharField(
@@ -256,7 +371,10 @@ class PDFDocument(models.Model):
     )
     file = models.FileField(
         upload_to='documents_pdf/%Y/%m/',
-        validators=[FileExtensionValidator(allowed_extensions=['pdf'])],
+        validators=[
+            FileExtensionValidator(allowed_extensions=['pdf']),
+            validate_pdf_magic,
+        ],
         help_text="Archivo PDF"
     )
     version = models.CharField(
@@ -270,6 +388,9 @@ class PDFDocument(models.Model):
         default='draft',
         help_text="Estado del documento"
     )
+    # Nota: en un despliegue PostgreSQL este campo sería un ArrayField con
+    # índice GIN (tags__contains usa el índice); con SQLite se mantiene CSV
+    # y los filtros pasan por PDFDocument.tagged() para centralizar el cambio
     tags = models.CharField(
         max_length=500,
         blank=True,
@@ -325,33 +446,74 @@ class PDFDocument(models.Model):
             models.Index(fields=['document_type', 'status']),
             models.Index(fields=['is_public']),
             models.Index(fields=['-created_at']),
+            # Búsquedas de existencia sin distinguir mayúsculas/minúsculas
+            models.Index(Lower('title'), name='pdfdoc_title_lower'),
+            # Documentos públicos ordenados por fecha sin ordenación extra
+            models.Index(fields=['is_public', '-created_at'],
+                         name='pdf_public_created_idx'),
         ]
     
     def __str__(self):
         return f"{self.title} ({self.get_status_display()})"
     
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Nombre del archivo al cargar la instancia: permite saltarse el
+        # stat/HEAD de file.size cuando el archivo no cambió
+        self._original_file_name = self.file.name if self.file else None
+
     def save(self, *args, **kwargs):
         """Guarda metadatos automáticamente."""
-        if self.file:
+        update_fields = kwargs.get('update_fields')
+        # Con update_fields sin 'file' el archivo no pudo cambiar:
+        # ni stat/HEAD ni columna file_size en el UPDATE
+        if (update_fields is None or 'file' in update_fields) and self.file and (
+            self._state.adding or self.file.name != self._original_file_name
+        ):
             self.file_size = self.file.size
+            if update_fields is not None and 'file_size' not in update_fields:
+                kwargs['update_fields'] = list(update_fields) + ['file_size']
         super().save(*args, **kwargs)
+        self._original_file_name = self.file.name if self.file else None
     
+    @cached_property
+    def file_size_mb(self):
+        """Tamaño del archivo en MB, calculado una sola vez por instancia."""
+        return round(self.file_size / (1024 * 1024), 2)
+
     def get_file_size_mb(self):
         """Retorna el tamaño del archivo en MB."""
-        return round(self.file_size / (1024 * 1024), 2)
+        return self.file_size_mb
     
-    def get_tags_list(self):
-        """Retorna las etiquetas como lista."""
+    @cached_property
+    def tags_list(self):
+        """Etiquetas como lista, calculadas una sola vez por instancia."""
         if self.tags:
             return [tag.strip() for tag in self.tags.split(',')]
         return []
+
+    def get_tags_list(self):
+        """Retorna las etiquetas como lista."""
+        return self.tags_list
+
+    @classmethod
+    def tagged(cls, tag):
+        """
+        QuerySet de documentos con una etiqueta.
+        Punto único de entrada para filtros por etiqueta: si tags migra a
+        ArrayField + GIN, solo cambia esta implementación.
+        """
+        return cls.objects.filter(tags__icontains=tag)
     
     def delete(self, *args, **kwargs):
         """Elimina el archivo físico al borrar el registro."""
-        if self.file:
-            if os.path.isfile(self.file.path):
-                os.remove(self.file.path)
+        file_name = self.file.name if self.file else None
+        storage = self.file.storage if file_name else None
         super().delete(*args, **kwargs)
+        # El storage API ignora archivos inexistentes y funciona también
+        # con backends remotos (sin os.path sobre rutas locales)
+        if file_name:
+            storage.delete(file_name)
 
 
 class FileVersion(models.Model):
@@ -408,7 +570,8 @@ class FileVersion(models.Model):
     
     def delete(self, *args, **kwargs):
         """Elimina el archivo de respaldo al borrar."""
-        if self.file_backup:
-            if os.path.isfile(self.file_backup.path):
-                os.remove(self.file_backup.path)
+        file_name = self.file_backup.name if self.file_backup else None
+        storage = self.file_backup.storage if file_name else None
         super().delete(*args, **kwargs)
+        if file_name:
+            storage.delete(file_name)
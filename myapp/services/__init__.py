@@ -1,3 +1,35 @@
 """
 Capa de servicios - Lógica de negocio de la aplicación BecaBot.
+
+Fábricas memoizadas de los servicios: una instancia por proceso en
+lugar de construir una nueva en cada vista. El estado mutable de cada
+servicio ya vive en cachés a nivel de clase protegidas con lock, así
+que compartir la instancia entre peticiones es seguro.
 """
+
+import functools
+
+
+@functools.lru_cache(maxsize=1)
+def get_document_service():
+    """Instancia compartida de DocumentService (docs_dir por defecto)."""
+    from myapp.services.document_service import DocumentService
+    return DocumentService()
+
+
+@functools.lru_cache(maxsize=1)
+def get_vectordb_service():
+    """Instancia compartida de VectorDBService (persist_dir por defecto)."""
+    from myapp.services.vectordb_service import VectorDBService
+    return VectorDBService()
+
+
+@functools.lru_cache(maxsize=1)
+def get_scraper_service():
+    """
+    Instancia compartida de ScraperService para lecturas (corpus_info).
+    Las ejecuciones de scraping en segundo plano crean la suya propia:
+    el driver de Selenium no es compartible entre hilos concurrentes.
+    """
+    from myapp.services.scraper_service import ScraperService
+    return ScraperService()
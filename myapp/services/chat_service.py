@@ -3,7 +3,13 @@ Servicio de chat con IA (RAG con LangChain + Gemini).
 Adaptado de utils/chatbot.py para Django.
 """
 
+import functools
+import hashlib
 import os
+import threading
+from collections import OrderedDict, defaultdict
+
+import numpy as np
 from dotenv import load_dotenv
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import AIMessage, HumanMessage
@@ -13,6 +19,26 @@ from google.api_core.exceptions import ResourceExhausted, PermissionDenied, Serv
 
 from myapp.prompts.chat_prompts import get_chat_prompt_template
 
+# Credenciales y prompt se resuelven una sola vez al importar el módulo,
+# no en cada construcción de servicio o de cadena
+load_dotenv()
+
+_PROMPT = get_chat_prompt_template()
+
+# Despacho rol -> clase de mensaje LangChain (filas malformadas se ignoran)
+_ROLE_MAP = {'human': HumanMessage, 'ai': AIMessage}
+
+
+@functools.lru_cache(maxsize=1)
+def _build_llm():
+    """Cliente Gemini único del proceso (el constructor resuelve credenciales)."""
+    return ChatGoogleGenerativeAI(
+        model="gemini-2.5-flash",
+        temperature=0.2,
+        max_output_tokens=2048,
+        convert_system_message_to_human=True
+    )
+
 
 class ChatService:
     """
@@ -20,26 +46,43 @@ class ChatService:
     Mantiene la lógica RAG original sin cambios.
     """
     
+    # Tamaño máximo de las cachés de respuestas y umbral de similitud
+    # coseno a partir del cual una pregunta se considera equivalente
+    RESPONSE_CACHE_SIZE = 256
+    SEMANTIC_THRESHOLD = 0.92
+    # Cadenas RAG vivas a la vez; en la práctica hay un solo vector DB,
+    # el tope solo evita crecer sin límite si eso cambia
+    CHAIN_CACHE_SIZE = 8
+
     def __init__(self):
-        load_dotenv()
         self.llm = None
         self.retrieval_chain = None
+        # Cadenas RAG memoizadas por vector DB (LRU); el lock protege la
+        # construcción perezosa bajo servidores WSGI multi-hilo
+        self._chain_cache = OrderedDict()
+        self._lock = threading.Lock()
+        # Caché exacta: sha256(pregunta + cola del historial) -> (respuesta, contexto)
+        self._exact_cache = OrderedDict()
+        # Caché semántica: lista de (embedding normalizado, respuesta, contexto)
+        self._sem_cache = []
     
     def _get_llm(self):
-        """Inicializa el modelo de lenguaje Gemini."""
+        """Inicializa el modelo de lenguaje Gemini (una sola vez, thread-safe)."""
         if not self.llm:
-            try:
-                self.llm = ChatGoogleGenerativeAI(
-                    model="gemini-2.5-flash",
-                    temperature=0.2,
-                    max_output_tokens=2048,
-                    convert_system_message_to_human=True
-                )
-            except (PermissionDenied, ResourceExhausted, ServiceUnavailable) as e:
-                print(f"❌ Error al conectar con Gemini: {e}")
-                return None
+            with self._lock:
+                if not self.llm:
+                    try:
+                        self.llm = _build_llm()
+                    except (PermissionDenied, ResourceExhausted, ServiceUnavailable) as e:
+                        print(f"❌ Error al conectar con Gemini: {e}")
+                        return None
         
         return self.llm
+
+    @staticmethod
+    def _vectordb_key(vectordb):
+        """Clave estable de un vector DB para memoizar su cadena."""
+        return getattr(vectordb, '_persist_directory', None) or id(vectordb)
     
     def create_retrieval_chain(self, vectordb):
         """
@@ -56,13 +99,15 @@ class ChatService:
             return None
         
         try:
+            # MMR sobre 30 candidatos: un solo embedding de la consulta y
+            # la selección se resuelve con operaciones numpy vectorizadas
+            # dentro de Chroma, en lugar de k refinamientos secuenciales
             retriever = vectordb.as_retriever(
-                search_type="similarity",
-                search_kwargs={"k": 15}
+                search_type="mmr",
+                search_kwargs={"k": 15, "fetch_k": 30, "lambda_mult": 0.5}
             )
             
-            prompt = get_chat_prompt_template()
-            chain = create_stuff_documents_chain(llm=llm, prompt=prompt)
+            chain = create_stuff_documents_chain(llm=llm, prompt=_PROMPT)
             retrieval_chain = create_retrieval_chain(retriever, chain)
             
             return retrieval_chain
@@ -85,7 +130,32 @@ class ChatService:
         if cached_chain:
             return cached_chain
         
-        return self.create_retrieval_chain(vectordb)
+        # Reutilizar la cadena ya construida para este vector DB: el
+        # cableado de LangChain (LLM, retriever, prompt) no es gratis
+        key = self._vectordb_key(vectordb)
+        chain = self._chain_cache.get(key)
+        if chain is None:
+            with self._lock:
+                chain = self._chain_cache.get(key)
+                if chain is None:
+                    chain = self.create_retrieval_chain(vectordb)
+                    if chain is not None:
+                        self._chain_cache[key] = chain
+                        while len(self._chain_cache) > self.CHAIN_CACHE_SIZE:
+                            self._chain_cache.popitem(last=False)
+        return chain
+    
+    def invalidate_chains(self):
+        """
+        Descarta las cadenas RAG y respuestas memoizadas.
+        Se invoca cuando la base de conocimiento cambia (nuevo corpus o
+        documentos): las cadenas apuntan a la colección anterior y las
+        respuestas cacheadas podrían haber quedado desactualizadas.
+        """
+        with self._lock:
+            self._chain_cache.clear()
+            self._exact_cache.clear()
+            self._sem_cache.clear()
     
     def get_response(self, question, chat_history, vectordb, retrieval_chain=None):
         """
@@ -100,6 +170,19 @@ class ChatService:
         Returns:
             Tupla (respuesta, contexto_documentos)
         """
+        # La inferencia del LLM domina la latencia: consultar primero las
+        # cachés (exacta y semántica) evita la llamada completa en repetidos
+        cache_key = self._cache_key(question, chat_history)
+        cached = self._exact_cache.get(cache_key)
+        if cached is not None:
+            self._exact_cache.move_to_end(cache_key)
+            return cached
+
+        embedding = self._embed_question(question, vectordb)
+        cached = self._semantic_lookup(embedding)
+        if cached is not None:
+            return cached
+
         chain = self.get_retrieval_chain(vectordb, retrieval_chain)
         
         if not chain:
@@ -110,12 +193,95 @@ class ChatService:
                 "input": question,
                 "chat_history": chat_history
             })
-            return response["answer"], response.get("context", [])
+            answer, context = response["answer"], response.get("context", [])
+            self._cache_response(cache_key, embedding, answer, context)
+            return answer, context
         
         except Exception as e:
             print(f"❌ Error al generar respuesta: {e}")
             return f"Ocurrió un error al procesar tu consulta: {str(e)}", []
+
+    def _cache_key(self, question, chat_history):
+        """Clave exacta: hash de la pregunta más la cola del historial."""
+        tail = "".join(m.content for m in chat_history[-4:])
+        return hashlib.sha256((question + tail).encode('utf-8')).hexdigest()
+
+    def _embed_question(self, question, vectordb):
+        """
+        Embedding normalizado de la pregunta, reutilizando la función de
+        embeddings del vector DB. Retorna None si no está disponible.
+        """
+        embedder = getattr(vectordb, '_embedding_function', None) if vectordb else None
+        if embedder is None:
+            return None
+        try:
+            vector = np.asarray(embedder.embed_query(question), dtype=np.float32)
+        except Exception as e:
+            print(f"⚠️ No se pudo calcular el embedding de la pregunta: {e}")
+            return None
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+    def _semantic_lookup(self, embedding):
+        """
+        Busca una pregunta equivalente entre las respuestas recientes.
+        Una multiplicación matricial resuelve todas las similitudes coseno
+        a la vez; sobre el umbral se reutiliza la respuesta cacheada.
+        """
+        if embedding is None or not self._sem_cache:
+            return None
+        matrix = np.stack([entry[0] for entry in self._sem_cache])
+        similarities = matrix @ embedding
+        best = int(np.argmax(similarities))
+        if similarities[best] >= self.SEMANTIC_THRESHOLD:
+            _, answer, context = self._sem_cache[best]
+            return answer, context
+        return None
+
+    def _cache_response(self, cache_key, embedding, answer, context):
+        """Registra la respuesta en ambas cachés, expulsando lo más viejo."""
+        self._exact_cache[cache_key] = (answer, context)
+        while len(self._exact_cache) > self.RESPONSE_CACHE_SIZE:
+            self._exact_cache.popitem(last=False)
+        if embedding is not None:
+            self._sem_cache.append((embedding, answer, context))
+            if len(self._sem_cache) > self.RESPONSE_CACHE_SIZE:
+                self._sem_cache.pop(0)
     
+    async def get_response_stream(self, question, chat_history, vectordb, retrieval_chain=None):
+        """
+        Genera la respuesta en streaming, token a token.
+        El primer fragmento llega con la latencia del primer token en vez
+        de esperar la generación completa; get_response sigue disponible
+        para clientes que no consumen streaming.
+
+        Args:
+            question: Pregunta del usuario
+            chat_history: Historial de conversación (lista de mensajes LangChain)
+            vectordb: Instancia de ChromaDB
+            retrieval_chain: Cadena en caché (opcional)
+
+        Yields:
+            Fragmentos de texto de la respuesta
+        """
+        chain = self.get_retrieval_chain(vectordb, retrieval_chain)
+
+        if not chain:
+            yield "No se pudo conectar con el modelo de IA."
+            return
+
+        try:
+            async for chunk in chain.astream({
+                "input": question,
+                "chat_history": chat_history
+            }):
+                piece = chunk.get("answer", "")
+                if piece:
+                    yield piece
+        except Exception as e:
+            print(f"❌ Error al generar respuesta en streaming: {e}")
+            yield f"Ocurrió un error al procesar tu consulta: {str(e)}"
+
     def convert_to_langchain_messages(self, messages_data):
         """
         Convierte mensajes de Django (dicts) a mensajes de LangChain.
@@ -126,15 +292,12 @@ class ChatService:
         Returns:
             Lista de objetos HumanMessage/AIMessage
         """
-        langchain_messages = []
-        
-        for msg in messages_data:
-            if msg['role'] == 'human':
-                langchain_messages.append(HumanMessage(content=msg['content']))
-            elif msg['role'] == 'ai':
-                langchain_messages.append(AIMessage(content=msg['content']))
-        
-        return langchain_messages
+        # Comprensión con despacho por dict: sin ramas ni append por mensaje
+        return [
+            _ROLE_MAP[msg['role']](content=msg['content'])
+            for msg in messages_data
+            if msg.get('role') in _ROLE_MAP
+        ]
     
     def extract_source_info(self, context_docs):
         """
@@ -146,38 +309,35 @@ class ChatService:
         Returns:
             Diccionario con pdf_sources y web_sources
         """
-        pdf_sources = {}
-        web_sources = {}
+        # Una sola pasada con sets: la deduplicación ocurre al insertar
+        # y no hace falta un segundo recorrido de limpieza
+        pdf_pages = defaultdict(set)
+        web_titles = defaultdict(set)
         
         for doc in context_docs:
             metadata = doc.metadata
             source = metadata.get('source', 'Desconocido')
             
             if source.endswith('.pdf'):
-                filename = os.path.basename(source)
-                if filename not in pdf_sources:
-                    pdf_sources[filename] = []
                 if 'page' in metadata:
-                    pdf_sources[filename].append(metadata['page'])
+                    try:
+                        pdf_pages[os.path.basename(source)].add(int(metadata['page']))
+                    except (TypeError, ValueError):
+                        pdf_pages[os.path.basename(source)].add(0)
+                else:
+                    pdf_pages[os.path.basename(source)]
             else:
-                if source not in web_sources:
-                    web_sources[source] = []
                 if 'titulo' in metadata:
-                    web_sources[source].append(metadata['titulo'])
-        
-        # Limpiar duplicados en PDFs
-        for filename in pdf_sources:
-            pages = pdf_sources[filename]
-            pdf_sources[filename] = sorted(
-                set(map(str, pages)), 
-                key=lambda x: int(x) if x.isdigit() else 0
-            )
-        
-        # Limpiar duplicados en web
-        for source in web_sources:
-            web_sources[source] = list(set(web_sources[source]))
+                    web_titles[source].add(metadata['titulo'])
+                else:
+                    web_titles[source]
         
         return {
-            'pdf_sources': pdf_sources,
-            'web_sources': web_sources
+            'pdf_sources': {fn: sorted(pages) for fn, pages in pdf_pages.items()},
+            'web_sources': {src: list(titles) for src, titles in web_titles.items()}
         }
+
+
+# Instancia compartida del proceso: todas las vistas reutilizan las mismas
+# cachés de respuestas y de cadenas en lugar de reconstruirlas por petición
+chat_service = ChatService()
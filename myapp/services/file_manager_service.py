@@ -5,7 +5,11 @@ Proporciona funcionalidades CRUD y utilidades para manejo de archivos.
 
 import json
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from itertools import islice
 from typing import Dict, List, Optional, Tuple
+from django.core.files import File
 from django.core.files.base import ContentFile
 from django.core.files.uploadedfile import UploadedFile
 from django.db.models import QuerySet
@@ -13,6 +17,232 @@ from myapp.models import JSONCorpus, PDFDocument, FileVersion
 from pypdf import PdfReader
 
 
+# Por encima de este tamaño el corpus se cuenta en streaming con ijson
+# en lugar de materializar la lista completa en memoria
+_STREAM_COUNT_THRESHOLD = 32 * 1024 * 1024
+
+
+def _count_json_records(file) -> int:
+    """
+    Cuenta los registros de un archivo JSON subido.
+    Usa orjson (parser en C) para archivos que caben en memoria e ijson
+    en streaming por encima del umbral; deja el puntero al inicio.
+    Lanza ValueError si el contenido no es JSON válido.
+    """
+    file.seek(0)
+    size = getattr(file, 'size', None)
+    try:
+        if size is not None and size > _STREAM_COUNT_THRESHOLD:
+            import ijson
+            # ijson.parse en vez de ijson.items: contar eventos de fin de
+            # registro no construye cada objeto, solo la ventana de parseo
+            # (memoria constante sin importar el tamaño del archivo)
+            return sum(
+                1 for prefix, event, _ in ijson.parse(file)
+                if prefix == 'item' and event in (
+                    'end_map', 'end_array', 'string', 'number',
+                    'boolean', 'null',
+                )
+            )
+        raw = file.read()
+        try:
+            import orjson
+            data = orjson.loads(raw)
+        except ImportError:
+            data = json.loads(raw)
+        return len(data) if isinstance(data, list) else 1
+    except json.JSONDecodeError:
+        raise
+    except Exception as e:
+        raise ValueError(str(e))
+    finally:
+        file.seek(0)
+
+
+def _json_preview(file, limit: int = 3):
+    """
+    Extrae los primeros registros de un archivo JSON subido para
+    precalcular la vista previa; deja el puntero al inicio.
+    La vista previa es opcional: ante cualquier error retorna None y
+    la vista cae al camino de lectura bajo demanda.
+    """
+    file.seek(0)
+    try:
+        try:
+            import ijson
+            # use_float: JSONField no sabe serializar los Decimal de ijson
+            preview = list(islice(ijson.items(file, 'item', use_float=True), limit))
+            if preview:
+                return preview
+            # Raíz no-lista (u objeto vacío): cargar completo
+            file.seek(0)
+        except ImportError:
+            pass
+        data = json.loads(file.read())
+        return data[:limit] if isinstance(data, list) else data
+    except Exception:
+        return None
+    finally:
+        file.seek(0)
+
+
+# Tiempo máximo dedicado a parsear un PDF para contar páginas
+_PAGE_COUNT_TIMEOUT = 5
+
+
+def _pdf_page_count(fileobj, timeout: int = _PAGE_COUNT_TIMEOUT) -> int:
+    """
+    Cuenta las páginas de un PDF con un watchdog.
+    strict=False evita el re-parseo completo ante inconsistencias menores
+    y el timeout corta PDFs patológicos que degeneran en un recorrido
+    objeto a objeto; en ese caso se retorna 0 y se continúa.
+    """
+    # Sin context manager: __exit__ haría shutdown(wait=True) y el
+    # llamador quedaría bloqueado hasta que el parseo colgado termine,
+    # anulando el timeout. Con wait=False se retorna de inmediato y el
+    # hilo del pool muere solo cuando PdfReader acabe.
+    executor = ThreadPoolExecutor(max_workers=1)
+    future = executor.submit(
+        lambda: len(PdfReader(fileobj, strict=False).pages)
+    )
+    try:
+        return future.result(timeout=timeout)
+    except FutureTimeoutError:
+        print("⚠️ Conteo de páginas abortado por timeout")
+        return 0
+    except Exception as e:
+        print(f"⚠️ No se pudo contar páginas del PDF: {e}")
+        return 0
+    finally:
+        executor.shutdown(wait=False)
+
+
+def _validate_json_header(file) -> bool:
+    """
+    Comprobación rápida de que el archivo parece JSON sin parsearlo
+    entero: basta confirmar el primer evento del stream (inicio de array
+    u objeto). Deja el puntero al inicio.
+    """
+    file.seek(0)
+    try:
+        try:
+            import ijson
+            event = next(ijson.parse(file), None)
+            return event is not None and event[1] in ('start_array', 'start_map')
+        except ImportError:
+            head = file.read(64).lstrip()
+            return head[:1] in (b'[', b'{', '[', '{')
+    except Exception:
+        return False
+    finally:
+        file.seek(0)
+
+
+def _finalize_corpus_async(corpus_id: int) -> None:
+    """
+    Calcula records_count de un corpus recién creado en segundo plano.
+    El parseo completo del JSON queda fuera del hilo de la petición.
+    """
+    try:
+        corpus = JSONCorpus.objects.get(id=corpus_id)
+        content, error = FileManagerService.load_json_content(corpus)
+        if error:
+            print(f"⚠️ No se pudo finalizar el corpus {corpus_id}: {error}")
+            return
+        corpus.records_count = len(content) if isinstance(content, list) else 1
+        corpus.preview_json = content[:3] if isinstance(content, list) else content
+        corpus.save(update_fields=['records_count', 'preview_json', 'updated_at'])
+    except Exception as e:
+        print(f"⚠️ No se pudo finalizar el corpus {corpus_id}: {e}")
+
+
+def _compress_corpus(file) -> Tuple[object, str]:
+    """
+    Comprime un corpus JSON con zstd nivel 3 para almacenarlo en reposo.
+    El JSON comprime 5-10x y descomprimir es más barato que parsearlo;
+    si zstandard no está instalado se almacena sin comprimir.
+    Retorna (archivo_a_guardar, etiqueta_de_compresión).
+    """
+    try:
+        import zstandard as zstd
+    except ImportError:
+        return file, ''
+    file.seek(0)
+    compressed = zstd.ZstdCompressor(level=3).compress(file.read())
+    name = os.path.basename(getattr(file, 'name', '') or 'corpus.json') + '.zst'
+    return ContentFile(compressed, name=name), 'zstd'
+
+
+def _sendfile_copy(src_path: str, dst_path: str) -> None:
+    """Copia src a dst con os.sendfile (copia en espacio de kernel)."""
+    import shutil
+    os.makedirs(os.path.dirname(dst_path), exist_ok=True)
+    with open(src_path, 'rb') as src, open(dst_path, 'wb') as dst:
+        remaining = os.fstat(src.fileno()).st_size
+        offset = 0
+        try:
+            while remaining > 0:
+                sent = os.sendfile(dst.fileno(), src.fileno(), offset, remaining)
+                if sent == 0:
+                    break
+                offset += sent
+                remaining -= sent
+        except OSError:
+            # sendfile no disponible para este par de descriptores
+            src.seek(offset)
+            shutil.copyfileobj(src, dst, length=1024 * 1024)
+
+
+def _restore_backup_file(instance, version) -> None:
+    """
+    Restaura el archivo de una versión sobre un modelo con FileField.
+    Con almacenamiento local la copia ocurre íntegra en el kernel vía
+    sendfile, sin pasar los bytes por Python; con backends remotos se
+    recurre al streaming normal a través del storage.
+    """
+    backup = version.file_backup
+    filename = os.path.basename(backup.name)
+    storage = instance.file.storage
+    # El backup pudo crearse con otra compresión que el archivo actual:
+    # sincronizar la bandera con la extensión de lo restaurado
+    if hasattr(instance, 'compression'):
+        instance.compression = 'zstd' if filename.endswith('.zst') else ''
+    try:
+        src_path = backup.path
+    except (NotImplementedError, ValueError):
+        src_path = None
+    
+    if src_path is not None and hasattr(storage, 'path'):
+        dst_name = storage.get_available_name(
+            instance.file.field.generate_filename(instance, filename)
+        )
+        _sendfile_copy(src_path, storage.path(dst_name))
+        instance.file.name = dst_name
+        update_fields = ['file', 'file_size', 'updated_at']
+        if hasattr(instance, 'compression'):
+            update_fields.append('compression')
+        instance.save(update_fields=update_fields)
+        return
+    
+    backup.open('rb')
+    instance.file.save(filename, File(backup), save=True)
+
+
+def _extract_page_count_async(document_id: int) -> None:
+    """
+    Extrae el número de páginas de un PDF ya guardado y lo persiste.
+    Se ejecuta en un hilo de fondo para no bloquear la petición de subida
+    mientras pypdf recorre el xref de archivos grandes.
+    """
+    try:
+        document = PDFDocument.objects.get(id=document_id)
+        with document.file.open('rb') as f:
+            document.page_count = _pdf_page_count(f)
+        document.save(update_fields=['page_count', 'updated_at'])
+    except Exception as e:
+        print(f"⚠️ No se pudo extraer el número de páginas (doc {document_id}): {e}")
+
+
 class FileManagerService:
     """
     Servicio centralizado para gestión de archivos JSON y PDF.
@@ -49,30 +279,31 @@ class FileManagerService:
             Tupla (corpus_creado, mensaje_error)
         """
         try:
-            # Validar que sea JSON válido
-            if validate_json:
-                try:
-                    json_content = json.load(file)
-                    records_count = len(json_content) if isinstance(json_content, list) else 1
-                except json.JSONDecodeError as e:
-                    return None, f"Archivo JSON inválido: {str(e)}"
-            else:
-                records_count = 0
-            
-            # Resetear puntero del archivo
-            file.seek(0)
+            # Validación rápida de cabecera: el parseo completo y el
+            # conteo de registros se hacen en segundo plano tras responder
+            if validate_json and not _validate_json_header(file):
+                return None, "Archivo JSON inválido: no comienza con un array u objeto"
             
-            # Crear corpus
+            # Comprimir en reposo y crear corpus
+            stored_file, compression = _compress_corpus(file)
             corpus = JSONCorpus.objects.create(
                 name=name,
                 corpus_type=corpus_type,
                 description=description,
-                file=file,
+                file=stored_file,
                 version=version,
-                records_count=records_count,
+                records_count=0,
+                compression=compression,
                 created_by=created_by
             )
             
+            if validate_json:
+                threading.Thread(
+                    target=_finalize_corpus_async,
+                    args=(corpus.id,),
+                    daemon=True
+                ).start()
+            
             return corpus, None
             
         except Exception as e:
@@ -109,32 +340,39 @@ class FileManagerService:
                     version=corpus.version or '1.0',
                     description=f"Versión anterior antes de actualización"
                 )
-            
+
+            changed = ['updated_at']
+
             # Actualizar archivo
             if new_file:
-                # Eliminar archivo antiguo
+                # Eliminar archivo antiguo vía storage: una sola operación
+                # sin la ventana exists/remove y compatible con backends remotos
                 if corpus.file:
-                    old_path = corpus.file.path
-                    if os.path.exists(old_path):
-                        os.remove(old_path)
+                    corpus.file.storage.delete(corpus.file.name)
                 
-                # Validar nuevo JSON
+                # Validar nuevo JSON (parser en C / streaming)
                 try:
-                    json_content = json.load(new_file)
-                    records_count = len(json_content) if isinstance(json_content, list) else 1
-                    new_file.seek(0)
-                    corpus.records_count = records_count
-                except json.JSONDecodeError as e:
+                    corpus.records_count = _count_json_records(new_file)
+                except (json.JSONDecodeError, ValueError) as e:
                     return None, f"Nuevo archivo JSON inválido: {str(e)}"
-                
-                corpus.file = new_file
-            
+
+                corpus.preview_json = _json_preview(new_file)
+
+                stored_file, compression = _compress_corpus(new_file)
+                corpus.file = stored_file
+                corpus.compression = compression
+                changed += [
+                    'records_count', 'preview_json', 'file', 'compression',
+                ]
+
             # Actualizar otros campos
             for field, value in update_fields.items():
                 if hasattr(corpus, field):
                     setattr(corpus, field, value)
-            
-            corpus.save()
+                    changed.append(field)
+
+            # UPDATE solo de las columnas tocadas, no de toda la fila
+            corpus.save(update_fields=changed)
             return corpus, None
             
         except JSONCorpus.DoesNotExist:
@@ -170,6 +408,15 @@ class FileManagerService:
             Tupla (contenido_json, mensaje_error)
         """
         try:
+            if corpus.compression == 'zstd':
+                import zstandard as zstd
+                with corpus.file.open('rb') as f:
+                    raw = zstd.ZstdDecompressor().decompress(f.read())
+                try:
+                    import orjson
+                    return orjson.loads(raw), None
+                except ImportError:
+                    return json.loads(raw), None
             with corpus.file.open('r', encoding='utf-8') as f:
                 content = json.load(f)
             return content, None
@@ -212,19 +459,7 @@ class FileManagerService:
             Tupla (documento_creado, mensaje_error)
         """
         try:
-            page_count = 0
-            
-            # Extraer metadatos del PDF
-            if extract_metadata:
-                try:
-                    file.seek(0)
-                    pdf_reader = PdfReader(file)
-                    page_count = len(pdf_reader.pages)
-                    file.seek(0)
-                except Exception as e:
-                    print(f"⚠️ No se pudo extraer metadatos del PDF: {e}")
-            
-            # Crear documento
+            # Crear documento: la respuesta no espera al parseo del PDF
             document = PDFDocument.objects.create(
                 title=title,
                 document_type=document_type,
@@ -234,10 +469,19 @@ class FileManagerService:
                 status=status,
                 tags=tags,
                 is_public=is_public,
-                page_count=page_count,
+                page_count=0,
                 created_by=created_by
             )
             
+            # Extraer metadatos en segundo plano una vez el archivo está
+            # en disco; page_count se actualiza con un UPDATE puntual
+            if extract_metadata:
+                threading.Thread(
+                    target=_extract_page_count_async,
+                    args=(document.id,),
+                    daemon=True
+                ).start()
+            
             return document, None
             
         except Exception as e:
@@ -275,31 +519,32 @@ class FileManagerService:
                     description=f"Versión anterior antes de actualización"
                 )
             
+            changed = ['updated_at']
+
             # Actualizar archivo
             if new_file:
-                # Eliminar archivo antiguo
+                # Eliminar archivo antiguo vía storage (sin exists previo)
                 if document.file:
-                    old_path = document.file.path
-                    if os.path.exists(old_path):
-                        os.remove(old_path)
-                
-                # Extraer metadatos del nuevo PDF
-                try:
-                    pdf_reader = PdfReader(new_file)
-                    page_count = len(pdf_reader.pages)
-                    new_file.seek(0)
+                    document.file.storage.delete(document.file.name)
+
+                # Extraer metadatos del nuevo PDF (con watchdog)
+                page_count = _pdf_page_count(new_file)
+                new_file.seek(0)
+                if page_count:
                     document.page_count = page_count
-                except Exception:
-                    pass
-                
+                    changed.append('page_count')
+
                 document.file = new_file
-            
+                changed.append('file')
+
             # Actualizar otros campos
             for field, value in update_fields.items():
                 if hasattr(document, field):
                     setattr(document, field, value)
-            
-            document.save()
+                    changed.append(field)
+
+            # UPDATE solo de las columnas tocadas, no de toda la fila
+            document.save(update_fields=changed)
             return document, None
             
         except PDFDocument.DoesNotExist:
@@ -335,7 +580,7 @@ class FileManagerService:
     # ========================================================================
     
     @staticmethod
-    def _create_version_backup(
+    def _build_version_backup(
         content_type: str,
         object_id: int,
         old_file,
@@ -343,21 +588,16 @@ class FileManagerService:
         description: str = ''
     ) -> Optional[FileVersion]:
         """
-        Crea una versión de respaldo de un archivo.
-        Método privado para uso interno.
+        Construye una versión de respaldo SIN persistirla.
+        Permite acumular varias versiones y guardarlas con bulk_create.
         """
         try:
-            # Leer contenido del archivo antiguo
-            old_file.seek(0)
-            content = old_file.read()
-            old_file.seek(0)
-            
-            # Crear archivo de respaldo
-            filename = os.path.basename(old_file.name)
-            backup_file = ContentFile(content, name=filename)
+            # Envolver el archivo abierto en lugar de leerlo a memoria:
+            # el storage copia en streaming y la RSS no crece con el tamaño
+            old_file.open('rb')
+            backup_file = File(old_file, name=os.path.basename(old_file.name))
             
-            # Crear registro de versión
-            file_version = FileVersion.objects.create(
+            return FileVersion(
                 content_type=content_type,
                 object_id=object_id,
                 version_number=version,
@@ -365,8 +605,42 @@ class FileManagerService:
                 change_description=description
             )
             
-            return file_version
-            
+        except Exception as e:
+            print(f"⚠️ Error al crear backup: {e}")
+            return None
+    
+    @staticmethod
+    def _persist_backups(backups: List[FileVersion]) -> List[FileVersion]:
+        """
+        Persiste una lista de versiones en un solo INSERT multi-fila.
+        """
+        backups = [b for b in backups if b is not None]
+        if not backups:
+            return []
+        from django.db import transaction
+        with transaction.atomic():
+            return FileVersion.objects.bulk_create(backups, batch_size=500)
+    
+    @staticmethod
+    def _create_version_backup(
+        content_type: str,
+        object_id: int,
+        old_file,
+        version: str,
+        description: str = ''
+    ) -> Optional[FileVersion]:
+        """
+        Crea una versión de respaldo de un archivo.
+        Método privado para uso interno.
+        """
+        backup = FileManagerService._build_version_backup(
+            content_type, object_id, old_file, version, description
+        )
+        if backup is None:
+            return None
+        try:
+            backup.save()
+            return backup
         except Exception as e:
             print(f"⚠️ Error al crear backup: {e}")
             return None
@@ -383,9 +657,13 @@ class FileManagerService:
         Returns:
             QuerySet de versiones ordenadas por fecha
         """
+        # Sin la columna file_backup: la ruta del blob solo hace falta
+        # al restaurar, no al listar versiones
         return FileVersion.objects.filter(
             content_type=content_type,
             object_id=object_id
+        ).only(
+            'id', 'version_number', 'created_at', 'change_description'
         ).order_by('-created_at')
     
     @staticmethod
@@ -417,14 +695,8 @@ class FileManagerService:
                     description='Backup automático antes de restaurar versión'
                 )
                 
-                # Restaurar archivo
-                version.file_backup.seek(0)
-                content = version.file_backup.read()
-                corpus.file.save(
-                    os.path.basename(version.file_backup.name),
-                    ContentFile(content),
-                    save=True
-                )
+                # Restaurar archivo (sendfile en local, streaming en remoto)
+                _restore_backup_file(corpus, version)
                 
             elif version.content_type == 'pdf_document':
                 document = PDFDocument.objects.get(id=version.object_id)
@@ -438,14 +710,8 @@ class FileManagerService:
                     description='Backup automático antes de restaurar versión'
                 )
                 
-                # Restaurar archivo
-                version.file_backup.seek(0)
-                content = version.file_backup.read()
-                document.file.save(
-                    os.path.basename(version.file_backup.name),
-                    ContentFile(content),
-                    save=True
-                )
+                # Restaurar archivo (sendfile en local, streaming en remoto)
+                _restore_backup_file(document, version)
             
             return True, None
             
@@ -462,20 +728,30 @@ class FileManagerService:
     def get_storage_stats() -> Dict:
         """
         Obtiene estadísticas de almacenamiento.
+        El resultado se cachea 60 segundos: solo alimenta el dashboard
+        del admin y los agregados recorren ambas tablas completas.
         
         Returns:
             Diccionario con estadísticas de uso de archivos
         """
-        from django.db.models import Sum
+        from django.core.cache import cache
+        return cache.get_or_set(
+            'fm:storage_stats', FileManagerService._compute_storage_stats, 60
+        )
+    
+    @staticmethod
+    def _compute_storage_stats() -> Dict:
+        """Calcula los agregados de almacenamiento contra la base."""
+        from django.db.models import Count, Sum
         
         json_stats = JSONCorpus.objects.aggregate(
             total_size=Sum('file_size'),
-            count=models.Count('id')
+            count=Count('id')
         )
         
         pdf_stats = PDFDocument.objects.aggregate(
             total_size=Sum('file_size'),
-            count=models.Count('id')
+            count=Count('id')
         )
         
         return {
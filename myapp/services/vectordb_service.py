@@ -3,9 +3,17 @@ Servicio de gestión de base de datos vectorial (ChromaDB).
 Adaptado de utils/prepare_vectordb.py para Django.
 """
 
+import functools
+import gzip
+import hashlib
 import os
 import json
+import shutil
+import threading
+import time
+import uuid
 import warnings
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 from langchain_community.document_loaders import PyPDFLoader
 from langchain.text_splitter import RecursiveCharacterTextSplitter
@@ -22,27 +30,155 @@ warnings.filterwarnings("ignore", message=".*torch.classes.*")
 warnings.filterwarnings("ignore", message=".*telemetry.*")
 
 
+@functools.lru_cache(maxsize=1)
+def _shared_embedding():
+    """
+    Modelo de embeddings compartido por el proceso.
+    Cargar MiniLM desde disco cuesta segundos y cientos de MB; hacerlo
+    una vez en lugar de en cada instancia del servicio. lru_cache
+    serializa la primera construcción entre hilos.
+    """
+    return HuggingFaceEmbeddings(
+        model_name="sentence-transformers/all-MiniLM-L6-v2",
+        model_kwargs={
+            "device": "cpu",
+            "trust_remote_code": True
+        },
+        # Lotes grandes: menos transiciones Python<->torch por chunk y
+        # mejor aprovechamiento del GEMM vectorizado en CPU
+        encode_kwargs={"normalize_embeddings": True, "batch_size": 64}
+    )
+
+
 class VectorDBService:
     """
     Servicio para gestión de la base de datos vectorial.
     Mantiene la lógica original sin cambios, adaptada a Django.
     """
     
+    # Tamaño de lote de inserción: cada add_documents entrega la lista
+    # completa a embed_documents, que a su vez encodea en sub-lotes de 64
+    # dentro de torch (ver _shared_embedding); no hay llamadas por chunk
+    _INSERT_BATCH = 256
+
+    # Tabla de traducción precompilada: normaliza saltos de línea y
+    # tabulaciones en una sola pasada en C, sin replace() encadenados
+    _WHITESPACE_TABLE = str.maketrans({'\n': ' ', '\r': ' ', '\t': ' '})
+    
+    # Splitter construido una sola vez: la configuración de separadores
+    # no cambia entre llamadas a get_text_chunks.
+    # 1000 caracteres ≈ 250 word-pieces: dentro de la ventana de 256
+    # tokens de MiniLM, que truncaba en silencio el resto de los chunks
+    # de 2000; solape del 10% para no cortar requisitos entre fragmentos
+    _SPLITTER = RecursiveCharacterTextSplitter(
+        chunk_size=1000,
+        chunk_overlap=100,
+        separators=["\n\n", "\nTÍTULO DE LA BECA:", "\n", " ", ""]
+    )
+    
+    # Manifiesto de indexación incremental: fuente -> hash de contenido
+    # e ids de sus fragmentos en la colección
+    _MANIFEST_NAME = "manifest.json"
+
     def __init__(self, persist_dir="Vector_DB - Documents"):
         load_dotenv()
         self.persist_dir = persist_dir
         self.embedding = self._get_embedding_model()
-    
+
     def _get_embedding_model(self):
-        """Configura el modelo de embeddings."""
-        return HuggingFaceEmbeddings(
-            model_name="sentence-transformers/all-MiniLM-L6-v2",
-            model_kwargs={
-                "device": "cpu",
-                "trust_remote_code": True
-            },
-            encode_kwargs={"normalize_embeddings": True}
-        )
+        """Retorna el modelo de embeddings compartido del proceso."""
+        return _shared_embedding()
+
+    # ------------------------------------------------------------------
+    # Indexación incremental (manifiesto por hash de contenido)
+    # ------------------------------------------------------------------
+
+    def _manifest_path(self):
+        return os.path.join(self.persist_dir, self._MANIFEST_NAME)
+
+    def _load_manifest(self):
+        """Manifiesto fuente -> {hash, ids}; vacío si no existe o está roto."""
+        try:
+            with open(self._manifest_path(), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def _save_manifest(self, manifest):
+        try:
+            os.makedirs(self.persist_dir, exist_ok=True)
+            with open(self._manifest_path(), 'w', encoding='utf-8') as f:
+                json.dump(manifest, f)
+        except OSError as e:
+            print(f"⚠️ No se pudo guardar el manifiesto: {e}")
+
+    @staticmethod
+    def _content_hash(path):
+        """
+        Hash blake2b del archivo, leído por bloques de 1 MiB.
+        El pico de memoria es un bloque, no el archivo completo;
+        buffering=0 evita la copia extra del buffer intermedio de io.
+        """
+        h = hashlib.blake2b(digest_size=16)
+        with open(path, 'rb', buffering=0) as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                h.update(block)
+        return h.hexdigest()
+
+    def _hash_sources(self, sources):
+        """
+        Hashes de contenido de todas las fuentes, en paralelo.
+        Las lecturas liberan el GIL, así que el costo es el del archivo
+        más lento y no la suma; mismo patrón que extract_pdf_text.
+        """
+        if not sources:
+            return {}
+        keys = list(sources)
+        with ThreadPoolExecutor(max_workers=min(8, len(keys))) as executor:
+            digests = executor.map(self._content_hash, (sources[k] for k in keys))
+            return dict(zip(keys, digests))
+
+    @staticmethod
+    def _current_sources(pdf_filenames, json_path, docs_dir="docs"):
+        """
+        Fuentes presentes en disco como dict clave -> ruta.
+        Las claves ('pdf:<nombre>' / 'json:corpus') son las del manifiesto.
+        """
+        sources = {}
+        for pdf in pdf_filenames or []:
+            path = os.path.join(docs_dir, pdf)
+            if os.path.exists(path):
+                sources[f'pdf:{pdf}'] = path
+        if os.path.exists(json_path + '.gz'):
+            sources['json:corpus'] = json_path + '.gz'
+        elif os.path.exists(json_path):
+            sources['json:corpus'] = json_path
+        return sources
+
+    @staticmethod
+    def _source_key(chunk):
+        """Clave de manifiesto de un fragmento según su metadata."""
+        source = chunk.metadata.get('source', '')
+        if source.endswith('.pdf'):
+            return f'pdf:{os.path.basename(source)}'
+        return 'json:corpus'
+
+    def _assign_chunk_ids(self, chunks, hashes):
+        """
+        Ids deterministas '<hash>:<índice>' por fuente (lexicográficamente
+        ordenables) y su agrupación para el manifiesto.
+        """
+        counters = {}
+        ids = []
+        grouped = {}
+        for chunk in chunks:
+            key = self._source_key(chunk)
+            idx = counters.get(key, 0)
+            counters[key] = idx + 1
+            chunk_id = f"{hashes.get(key, 'na')}:{idx:06d}"
+            ids.append(chunk_id)
+            grouped.setdefault(key, []).append(chunk_id)
+        return ids, grouped
     
     def extract_pdf_text(self, pdf_filenames, docs_dir="docs"):
         """
@@ -61,13 +197,25 @@ class VectorDBService:
             print(f"⚠️ La carpeta '{docs_dir}' no existe.")
             return docs
         
-        for pdf in pdf_filenames:
-            pdf_path = os.path.join(docs_dir, pdf)
+        if not pdf_filenames:
+            return docs
+        
+        def _cargar(pdf):
+            """Extrae un PDF y retorna (nombre, documentos, error)."""
             try:
-                docs.extend(PyPDFLoader(pdf_path).load())
-                print(f"✓ Texto extraído de {pdf}")
+                return pdf, PyPDFLoader(os.path.join(docs_dir, pdf)).load(), None
             except Exception as e:
-                print(f"⚠️ Error al procesar {pdf}: {e}")
+                return pdf, [], str(e)
+        
+        # La extracción es I/O + parseo que libera el GIL: los PDFs se
+        # procesan en paralelo y el orden de entrada se conserva
+        with ThreadPoolExecutor(max_workers=min(8, len(pdf_filenames))) as executor:
+            for pdf, extracted, error in executor.map(_cargar, pdf_filenames):
+                if error:
+                    print(f"⚠️ Error al procesar {pdf}: {error}")
+                else:
+                    docs.extend(extracted)
+                    print(f"✓ Texto extraído de {pdf}")
         
         return docs
     
@@ -84,17 +232,34 @@ class VectorDBService:
         """
         docs = []
         
-        if not os.path.exists(json_path):
+        # Preferir la variante comprimida que escribe el scraper
+        if os.path.exists(json_path + '.gz'):
+            json_path = json_path + '.gz'
+        elif not os.path.exists(json_path):
             print(f"⚠️ No se encontró el archivo JSON en {json_path}")
             return docs
         
+        opener = gzip.open if json_path.endswith('.gz') else open
+        
         try:
-            with open(json_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            # ijson entrega los items uno a uno: el pico de memoria es una
+            # beca, no la lista completa, y el primer Document se construye
+            # sin esperar el parseo del archivo entero
+            try:
+                import ijson
+                
+                def _iter_items():
+                    with opener(json_path, 'rb') as f:
+                        yield from ijson.items(f, 'item')
+                
+                items = _iter_items()
+            except ImportError:
+                with opener(json_path, "rt", encoding="utf-8") as f:
+                    items = json.load(f)
             
-            print(f"📂 Procesando {len(data)} becas del archivo JSON...")
+            print("📂 Procesando becas del archivo JSON...")
             
-            for item in data:
+            for item in items:
                 titulo = item.get("titulo", "Beca sin título")
                 url = item.get("url", "")
                 nivel = item.get("nivel", "General")
@@ -102,12 +267,15 @@ class VectorDBService:
                 modalidades = ", ".join(item.get("modalidades", []))
                 
                 contenido_raw = item.get("contenido", {})
-                contenido_texto = ""
                 
+                # Acumular en lista y unir al final: lineal frente al
+                # costo cuadrático de concatenar strings con +=
                 if isinstance(contenido_raw, dict):
-                    for clave, valor in contenido_raw.items():
-                        valor_limpio = str(valor).replace('\n', ' ').strip()
-                        contenido_texto += f"- {clave}: {valor_limpio}\n"
+                    tabla = self._WHITESPACE_TABLE
+                    contenido_texto = "".join(
+                        f"- {clave}: {str(valor).translate(tabla).strip()}\n"
+                        for clave, valor in contenido_raw.items()
+                    )
                 else:
                     contenido_texto = str(contenido_raw)
                 
@@ -151,12 +319,7 @@ class VectorDBService:
         Returns:
             Lista de fragmentos
         """
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=2000,
-            chunk_overlap=300,
-            separators=["\n\n", "\nTÍTULO DE LA BECA:", "\n", " ", ""]
-        )
-        return text_splitter.split_documents(docs)
+        return self._SPLITTER.split_documents(docs)
     
     def load_existing_vectorstore(self):
         """
@@ -214,7 +377,19 @@ class VectorDBService:
         # Dividir en chunks
         chunks = self.get_text_chunks(all_docs)
         print(f"📊 Total de fragmentos generados: {len(chunks)}")
-        
+
+        # Ids deterministas por hash de fuente: quedan registrados en el
+        # manifiesto para que las regeneraciones posteriores sean deltas
+        sources = self._current_sources(pdf_filenames, json_path)
+        hashes = self._hash_sources(sources)
+        ids, grouped = self._assign_chunk_ids(chunks, hashes)
+
+        # Insertar en orden lexicográfico de id ('<hash>:<índice>' con
+        # índice a ancho fijo): las escrituras del store caen en páginas
+        # contiguas en lugar de saltar entre fuentes
+        if ids:
+            ids, chunks = map(list, zip(*sorted(zip(ids, chunks), key=lambda e: e[0])))
+
         # Crear Vector Store
         try:
             settings = chromadb.config.Settings(
@@ -223,20 +398,149 @@ class VectorDBService:
                 chroma_telemetry_impl="none"
             )
             client = chromadb.PersistentClient(
-                path=self.persist_dir, 
+                path=self.persist_dir,
                 settings=settings
             )
-            vectordb = Chroma.from_documents(
-                documents=chunks,
-                embedding=self.embedding,
-                client=client
+            vectordb = Chroma(
+                client=client,
+                embedding_function=self.embedding,
+                # search_ef alto estabiliza el orden de los resultados HNSW
+                # al variar k (se fija al crear la colección)
+                collection_metadata={"hnsw:search_ef": 64}
             )
+            # Insertar por lotes: los embeddings de cada lote se escriben
+            # al store persistente en lugar de retener todos en RAM
+            batch = self._INSERT_BATCH
+            for i in range(0, len(chunks), batch):
+                vectordb.add_documents(chunks[i:i + batch], ids=ids[i:i + batch])
+                print(f"   → Indexados {min(i + batch, len(chunks))}/{len(chunks)} fragmentos")
+            self._save_manifest({
+                key: {'hash': hashes[key], 'ids': grouped.get(key, [])}
+                for key in sources
+            })
             print("✓ Base vectorial creada y guardada.")
             return vectordb
-        
+
         except Exception as e:
             print(f"❌ Error al crear la base vectorial: {e}")
             return None
+
+    def update_vectorstore(self, pdf_filenames, json_path="knowledge_base/corpus_utpl.json"):
+        """
+        Actualiza la base vectorial de forma incremental.
+
+        Compara el hash de cada fuente con el manifiesto y solo
+        re-embebe las que cambiaron; el resto de la colección queda
+        intacta. Re-embeber es el costo dominante de una regeneración,
+        así que el trabajo es proporcional a lo que cambió y no al
+        total de documentos. Sin base o sin manifiesto cae a la
+        reconstrucción completa.
+
+        Args:
+            pdf_filenames: Lista de nombres de PDFs
+            json_path: Ruta al JSON de becas
+
+        Returns:
+            Instancia de Chroma o None si falla
+        """
+        manifest = self._load_manifest()
+        vectordb = self.load_existing_vectorstore() if manifest else None
+        if vectordb is None:
+            return self.create_vectorstore(pdf_filenames, json_path)
+
+        sources = self._current_sources(pdf_filenames, json_path)
+        hashes = self._hash_sources(sources)
+
+        removed = [key for key in manifest if key not in sources]
+        changed = [
+            key for key in sources
+            if manifest.get(key, {}).get('hash') != hashes[key]
+        ]
+
+        if not removed and not changed:
+            print("✓ Base vectorial al día: ninguna fuente cambió.")
+            return vectordb
+
+        try:
+            # Primero borrar los fragmentos viejos de fuentes cambiadas
+            # o eliminadas, luego insertar solo los nuevos
+            stale_ids = [
+                chunk_id
+                for key in removed + changed
+                for chunk_id in manifest.get(key, {}).get('ids', [])
+            ]
+            if stale_ids:
+                vectordb.delete(ids=stale_ids)
+            for key in removed:
+                manifest.pop(key, None)
+
+            for key in changed:
+                if key.startswith('pdf:'):
+                    docs = self.extract_pdf_text([key[len('pdf:'):]])
+                else:
+                    docs = self.extract_json_text(json_path)
+                chunks = self.get_text_chunks(docs)
+                ids, grouped = self._assign_chunk_ids(chunks, hashes)
+                batch = self._INSERT_BATCH
+                for i in range(0, len(chunks), batch):
+                    vectordb.add_documents(chunks[i:i + batch], ids=ids[i:i + batch])
+                manifest[key] = {'hash': hashes[key], 'ids': grouped.get(key, [])}
+                print(f"   → Fuente {key} reindexada ({len(chunks)} fragmentos)")
+
+            self._save_manifest(manifest)
+            print(f"✓ Actualización incremental: {len(changed)} fuente(s) "
+                  f"reindexada(s), {len(removed)} eliminada(s).")
+            return vectordb
+
+        except Exception as e:
+            print(f"❌ Error en la actualización incremental: {e}")
+            return self.create_vectorstore(pdf_filenames, json_path)
+
+    def rebuild_vectorstore(self, pdf_filenames, json_path="knowledge_base/corpus_utpl.json"):
+        """
+        Reconstrucción completa sin ventana de indisponibilidad.
+
+        Construye el índice nuevo en un directorio temporal y lo pone en
+        su lugar con os.rename (atómico dentro del mismo filesystem):
+        los lectores concurrentes siguen sirviendo el índice viejo hasta
+        el intercambio, en lugar de encontrarse un directorio vacío a
+        mitad de la reconstrucción. El directorio viejo se borra en un
+        hilo de fondo.
+
+        Args:
+            pdf_filenames: Lista de nombres de PDFs
+            json_path: Ruta al JSON de becas
+
+        Returns:
+            Instancia de Chroma sobre el índice nuevo o None si falla
+        """
+        tmp_dir = f"{self.persist_dir}.new-{uuid.uuid4().hex[:8]}"
+        builder = VectorDBService(persist_dir=tmp_dir)
+        if builder.create_vectorstore(pdf_filenames, json_path) is None:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return None
+
+        old_dir = f"{self.persist_dir}.old-{int(time.time())}"
+        try:
+            if os.path.exists(self.persist_dir):
+                os.rename(self.persist_dir, old_dir)
+            os.rename(tmp_dir, self.persist_dir)
+        except OSError as e:
+            print(f"❌ Error al intercambiar la base vectorial: {e}")
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return None
+
+        if os.path.exists(old_dir):
+            threading.Thread(
+                target=shutil.rmtree,
+                args=(old_dir,),
+                kwargs={'ignore_errors': True},
+                daemon=True,
+            ).start()
+
+        # Cliente fresco sobre la ruta definitiva (el del builder quedó
+        # ligado al nombre temporal)
+        return self.load_existing_vectorstore()
     
     def get_vectorstore(self, pdf_filenames, force_regenerate=False):
         """
@@ -0,0 +1,137 @@
+"""
+Tareas de larga duración ejecutadas fuera del hilo de la petición.
+
+El despliegue no tiene broker de colas (Celery/RQ), así que se usan
+hilos daemon, el mismo patrón que file_manager_service: la vista crea
+el registro de seguimiento, lanza el hilo y responde de inmediato; el
+frontend consulta el avance vía la vista admin_scraping_status.
+"""
+
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+def _invalidate_dashboard_cache():
+    """Descartar las estadísticas cacheadas del panel tras una mutación."""
+    from django.core.cache import cache
+    from myapp.views import DASHBOARD_STATS_CACHE_KEY
+    cache.delete(DASHBOARD_STATS_CACHE_KEY)
+
+
+def regenerate_vectorstore_task():
+    """
+    Actualiza la base vectorial con los documentos actuales.
+    Incremental: solo re-embebe las fuentes cuyo contenido cambió según
+    el manifiesto; la reconstrucción completa queda para la vista admin.
+    """
+    from myapp.services import get_document_service, get_vectordb_service
+
+    pdf_files = get_document_service().get_existing_documents()
+    get_vectordb_service().update_vectorstore(pdf_files)
+
+
+def run_scraping_task(log_id: int) -> None:
+    """
+    Ejecuta el scraping completo y actualiza el ScrapingLog asociado.
+    Si el scraping tiene éxito regenera también la base vectorial.
+    """
+    from myapp.models import ScrapingLog
+    from myapp.services.scraper_service import ScraperService
+
+    log = ScrapingLog.objects.get(id=log_id)
+    log.status = 'running'
+    log.save(update_fields=['status'])
+
+    try:
+        success, num_becas, error_msg = ScraperService().scrape_becas()
+
+        log.success = success
+        log.num_becas = num_becas
+        log.error_message = error_msg if not success else None
+        log.status = 'success' if success else 'error'
+        log.save(update_fields=['success', 'num_becas', 'error_message', 'status'])
+
+        if success:
+            logger.info("Regenerando base vectorial en segundo plano...")
+            regenerate_vectorstore_task()
+            logger.info("Base vectorial regenerada")
+    except Exception as e:
+        log.success = False
+        log.error_message = str(e)
+        log.status = 'error'
+        log.save(update_fields=['success', 'error_message', 'status'])
+        logger.error("❌ Error en scraping en segundo plano: %s", e)
+    finally:
+        _invalidate_dashboard_cache()
+
+
+def dispatch_scraping() -> int:
+    """
+    Crea el registro pendiente y lanza el scraping en un hilo daemon.
+    Devuelve el id del ScrapingLog para que el frontend sondee su estado.
+    """
+    from myapp.models import ScrapingLog
+
+    log = ScrapingLog.objects.create(status='pending', success=False)
+    threading.Thread(
+        target=run_scraping_task, args=(log.id,), daemon=True
+    ).start()
+    return log.id
+
+
+def full_rebuild_task(json_path: str) -> None:
+    """
+    Reconstrucción completa de la base vectorial (intercambio atómico).
+    Publica su avance en la caché para la vista de estado.
+    """
+    from django.core.cache import cache
+    from myapp.services import get_document_service, get_vectordb_service
+    from myapp.services.chat_service import chat_service
+    from myapp.views import VECTORDB_REBUILD_STATUS_KEY
+
+    cache.set(VECTORDB_REBUILD_STATUS_KEY, {'status': 'running'}, 3600)
+    try:
+        pdf_files = get_document_service().get_existing_documents()
+        vectordb = get_vectordb_service().rebuild_vectorstore(pdf_files, json_path)
+        if vectordb is not None:
+            chat_service.invalidate_chains()
+            cache.set(VECTORDB_REBUILD_STATUS_KEY, {
+                'status': 'success',
+                'pdf_count': len(pdf_files),
+            }, 3600)
+        else:
+            cache.set(VECTORDB_REBUILD_STATUS_KEY, {
+                'status': 'error',
+                'error': 'Error al crear la base vectorial',
+            }, 3600)
+    except Exception as e:
+        cache.set(VECTORDB_REBUILD_STATUS_KEY, {
+            'status': 'error',
+            'error': str(e),
+        }, 3600)
+
+
+def dispatch_full_rebuild(json_path: str = "knowledge_base/corpus_utpl.json") -> None:
+    """Lanza la reconstrucción completa en un hilo daemon."""
+    threading.Thread(
+        target=full_rebuild_task, args=(json_path,), daemon=True
+    ).start()
+
+
+def dispatch_vectorstore_regeneration(on_done=None) -> None:
+    """
+    Regenera la base vectorial en un hilo daemon.
+    on_done (opcional) se invoca solo si la regeneración termina bien,
+    p. ej. para marcar documentos como procesados.
+    """
+    def _run():
+        try:
+            regenerate_vectorstore_task()
+            if on_done is not None:
+                on_done()
+        except Exception as e:
+            logger.error("❌ Error regenerando la base vectorial: %s", e)
+
+    threading.Thread(target=_run, daemon=True).start()
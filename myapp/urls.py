@@ -5,12 +5,14 @@ urlpatterns = [
     # URLs del chatbot principal
     path('', views.home, name='home'),
     path('send-message/', views.send_message, name='send_message'),
+    path('send-message-stream/', views.send_message_stream, name='send_message_stream'),
     path('get-chat-history/', views.get_chat_history, name='get_chat_history'),
     path('upload-documents/', views.upload_documents, name='upload_documents'),
     path('update-becas/', views.update_becas, name='update_becas'),
     path('clear-chat/', views.clear_chat, name='clear_chat'),
     path('test-bot/', views.test_bot, name='test_bot'),
     path('regenerate-vectordb/', views.regenerate_vectordb, name='regenerate_vectordb'),
+    path('regenerate-vectordb/status/', views.regenerate_vectordb_status, name='regenerate_vectordb_status'),
     
     # URLs del Panel de Administración
     path('admin-panel/', views.admin_panel, name='admin_panel'),
@@ -33,6 +35,8 @@ urlpatterns = [
     # Otros
     path('admin-panel/messages/', views.admin_messages, name='admin_messages'),
     path('admin-panel/messages/clear/', views.admin_messages_clear, name='admin_messages_clear'),
+    path('admin-panel/messages/clear-bulk/', views.admin_messages_clear_bulk, name='admin_messages_clear_bulk'),
     path('admin-panel/scraping/', views.admin_scraping, name='admin_scraping'),
     path('admin-panel/scraping/run/', views.admin_run_scraping, name='admin_run_scraping'),
+    path('admin-panel/scraping/status/<int:pk>/', views.admin_scraping_status, name='admin_scraping_status'),
 ]
\ No newline at end of file
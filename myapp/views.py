@@ -3,7 +3,70 @@ Vistas de Django para BecaBot UTPL.
 Arquitectura limpia separando presentación de lógica de negocio.
 Adaptadas para usar el template existente en myapp/template/index.html
 """
-from django.shortcuts import render
+import hashlib
+import json
+import logging
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib import messages
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connection, connections, transaction
+from django.db.models import Count, Q, Sum
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404, render, redirect
+from django.views.decorators.http import require_http_methods
+
+from myapp.forms import ChatForm, DocumentUploadForm
+from myapp.models import (
+    ChatMessage,
+    JSONCorpus,
+    PDFDocument,
+    ScrapingLog,
+    UploadedDocument,
+)
+from myapp.services import (
+    get_document_service,
+    get_scraper_service,
+    get_vectordb_service,
+)
+from myapp.services.chat_service import chat_service
+from myapp.services.file_manager_service import (
+    FileManagerService,
+    _count_json_records,
+    _json_preview,
+)
+from myapp.tasks import (
+    dispatch_full_rebuild,
+    dispatch_scraping,
+    dispatch_vectorstore_regeneration,
+)
+
+logger = logging.getLogger(__name__)
+
+# Serializador en Rust para payloads JSON grandes; opcional, igual que
+# en file_manager_service
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _json_response(payload, status=200):
+    """
+    JsonResponse acelerado con orjson si está instalado.
+    Pensado para payloads voluminosos (listas de PDFs, tracebacks);
+    sin orjson cae al encoder estándar de Django.
+    """
+    if orjson is None:
+        return JsonResponse(payload, status=status)
+    return HttpResponse(
+        orjson.dumps(payload), status=status, content_type='application/json'
+    )
 
 
 def is_ajax(request):
@@ -28,78 +91,168 @@ def render_partial_or_base(request, partial_name, context=None, base_template='a
     if is_ajax(request):
         return render(request, f"partials/{partial_name}.html", context)
     else:
-        # Primera carga: renderizar el partial dentro del admin_base
-        from django.template.loader import render_to_string
-        partial_html = render_to_string(f"partials/{partial_name}.html", context, request=request)
-        context['initial_content'] = partial_html
+        # Primera carga: el base hace un único {% include %} del partial
+        # en vez de render_to_string previo + |safe, que renderizaba el
+        # partial a un string intermedio en una pasada aparte.
+        # El HTML completo no se cachea: los partials incrustan tokens
+        # CSRF que cambian (y deben cambiar) en cada petición
+        context['partial_template'] = f"partials/{partial_name}.html"
         return render(request, base_template, context)
 
 
+def _paginate(request, queryset, cache_prefix, filters=()):
+    """
+    Pagina un queryset a 25 filas por página según ?page=.
+    
+    El COUNT(*) es la parte cara en tablas grandes, así que se cachea
+    30 segundos por combinación de filtros y se inyecta en el Paginator
+    antes de resolver la página.
+    """
+    
+    filters_hash = hashlib.sha256(
+        '|'.join(str(f) for f in filters).encode('utf-8')
+    ).hexdigest()[:16]
+    paginator = Paginator(queryset, 25)
+    paginator.count = cache.get_or_set(
+        f'{cache_prefix}:{filters_hash}', queryset.count, 30
+    )
+    return paginator.get_page(request.GET.get('page'))
+
+
 def index(request):
     return render(request, 'index.html')
 
 
+# Clave de caché de las estadísticas del dashboard; las vistas de
+# escritura la invalidan para no servir datos viejos más de lo necesario
+DASHBOARD_STATS_CACHE_KEY = 'admin_panel_stats_v1'
+
+# Estado de la reconstrucción completa de la base vectorial (la tarea
+# en segundo plano lo escribe; la vista de estado lo sirve)
+VECTORDB_REBUILD_STATUS_KEY = 'vectordb_rebuild_status'
+
+
+def _compute_dashboard_stats():
+    """Calcula las estadísticas del dashboard (un agregado por modelo).
+
+    Devuelve solo primitivos y dicts para que el resultado sea barato
+    de serializar en la caché.
+    """
+    
+    # Un agregado por modelo en lugar de un COUNT/SUM por métrica:
+    # el panel pasa de ~10 round-trips a 4
+    def _corpus_stats():
+        return JSONCorpus.objects.aggregate(
+            total=Count('id'),
+            active=Count('id', filter=Q(is_active=True)),
+            size=Sum('file_size'),
+        )
+    
+    def _pdf_stats():
+        return PDFDocument.objects.aggregate(
+            total=Count('id'),
+            public=Count('id', filter=Q(is_public=True)),
+            size=Sum('file_size'),
+        )
+    
+    def _message_stats():
+        return ChatMessage.objects.aggregate(
+            total=Count('id'),
+            sessions=Count('session_key', distinct=True),
+        )
+    
+    def _scraping_stats():
+        return (
+            ScrapingLog.objects.filter(success=True).count(),
+            ScrapingLog.objects.filter(success=True).order_by(
+                '-executed_at'
+            ).values('executed_at', 'num_becas').first(),
+        )
+    
+    if connection.vendor == 'sqlite':
+        # SQLite serializa las escrituras sobre un único archivo y no
+        # gana nada con consultas concurrentes: ejecutar en secuencia
+        corpus_stats = _corpus_stats()
+        pdf_stats = _pdf_stats()
+        message_stats = _message_stats()
+        total_scrapings, last_scraping = _scraping_stats()
+    else:
+        # Los agregados son independientes: en Postgres/MySQL se emiten
+        # en paralelo y la latencia pasa de la suma al máximo
+        
+        def _con_conexion_propia(fn):
+            # Django abre una conexión por hilo; se cierra al terminar
+            # para no dejarla huérfana en el hilo del pool
+            try:
+                return fn()
+            finally:
+                connections.close_all()
+        
+        with ThreadPoolExecutor(max_workers=4) as ex:
+            corpus_f = ex.submit(_con_conexion_propia, _corpus_stats)
+            pdf_f = ex.submit(_con_conexion_propia, _pdf_stats)
+            msg_f = ex.submit(_con_conexion_propia, _message_stats)
+            scr_f = ex.submit(_con_conexion_propia, _scraping_stats)
+        corpus_stats = corpus_f.result()
+        pdf_stats = pdf_f.result()
+        message_stats = msg_f.result()
+        total_scrapings, last_scraping = scr_f.result()
+    
+    # Calcular espacio usado (aproximado)
+    total_size = (
+        (corpus_stats['size'] or 0) + (pdf_stats['size'] or 0)
+    ) / (1024 * 1024)  # Convertir a MB
+    
+    stats = {
+        'total_corpus': corpus_stats['total'],
+        'active_corpus': corpus_stats['active'],
+        'total_pdfs': pdf_stats['total'],
+        'public_pdfs': pdf_stats['public'],
+        'total_messages': message_stats['total'],
+        'total_scrapings': total_scrapings,
+        'total_size_mb': round(total_size, 2),
+        'active_sessions': message_stats['sessions']
+    }
+    
+    # Actividad reciente, materializada como dicts (nada de querysets
+    # ni instancias de modelo dentro de la caché)
+    recent_corpus = list(
+        JSONCorpus.objects.order_by('-created_at')
+        .values('id', 'name', 'is_active', 'created_at')[:5]
+    )
+    status_labels = dict(PDFDocument.STATUS_CHOICES)
+    recent_pdfs = [
+        # El template usa pdf.get_status_display: se expone como clave
+        # del dict para no tocar el partial
+        {**row, 'get_status_display': status_labels.get(row['status'], row['status'])}
+        for row in PDFDocument.objects.order_by('-created_at')
+        .values('id', 'title', 'status', 'created_at')[:5]
+    ]
+    
+    return {
+        'stats': stats,
+        'recent_corpus': recent_corpus,
+        'recent_pdfs': recent_pdfs,
+        'last_scraping': last_scraping,
+    }
+
+
 def admin_panel(request):
     """Panel principal de administración."""
     try:
-        from myapp.models import ChatMessage, JSONCorpus, PDFDocument, ScrapingLog
-        from django.db.models import Sum
-        import os
-        
-        # Estadísticas de Corpus JSON
-        total_corpus = JSONCorpus.objects.count()
-        active_corpus = JSONCorpus.objects.filter(is_active=True).count()
         
-        # Estadísticas de PDFs
-        total_pdfs = PDFDocument.objects.count()
-        public_pdfs = PDFDocument.objects.filter(is_public=True).count()
+        # Las tablas cambian despacio: 60 s de caché eliminan todo el
+        # trabajo de BD en los hits
+        context = dict(cache.get_or_set(
+            DASHBOARD_STATS_CACHE_KEY, _compute_dashboard_stats, timeout=60
+        ))
+        context['section'] = 'dashboard'
         
-        # Estadísticas de Mensajes
-        total_messages = ChatMessage.objects.count()
-        active_sessions = ChatMessage.objects.values('session_key').distinct().count()
-        
-        # Estadísticas de Scraping
-        total_scrapings = ScrapingLog.objects.filter(success=True).count()
-        last_scraping = ScrapingLog.objects.filter(success=True).order_by('-executed_at').first()
-        
-        # Calcular espacio usado (aproximado)
-        total_size = 0
-        # Tamaño de corpus
-        corpus_size = JSONCorpus.objects.aggregate(total=Sum('file_size'))['total'] or 0
-        # Tamaño de PDFs
-        pdf_size = PDFDocument.objects.aggregate(total=Sum('file_size'))['total'] or 0
-        total_size = (corpus_size + pdf_size) / (1024 * 1024)  # Convertir a MB
-        
-        stats = {
-            'total_corpus': total_corpus,
-            'active_corpus': active_corpus,
-            'total_pdfs': total_pdfs,
-            'public_pdfs': public_pdfs,
-            'total_messages': total_messages,
-            'total_scrapings': total_scrapings,
-            'total_size_mb': round(total_size, 2),
-            'active_sessions': active_sessions
-        }
-        
-        # Actividad reciente
-        recent_corpus = JSONCorpus.objects.all().order_by('-created_at')[:5]
-        recent_pdfs = PDFDocument.objects.all().order_by('-created_at')[:5]
-        
-        context = {
-            'stats': stats,
-            'recent_corpus': recent_corpus,
-            'recent_pdfs': recent_pdfs,
-            'last_scraping': last_scraping,
-            'section': 'dashboard',
-        }
-        
-        print(f"Dashboard Stats: {stats}", flush=True)
+        logger.debug("Dashboard Stats: %s", context['stats'])
         return render_partial_or_base(request, 'admin_panel', context)
         
     except Exception as e:
-        print(f"Error en admin_panel: {e}", flush=True)
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error en admin_panel: %s", e)
         # Retornar con estadísticas vacías en caso de error
         context = {
             'stats': {
@@ -122,14 +275,17 @@ def admin_panel(request):
 
 def admin_corpus(request):
     """Lista de corpus JSON."""
-    from myapp.models import JSONCorpus
     
     # Obtener filtros
     corpus_type = request.GET.get('corpus_type', '')
     is_active = request.GET.get('is_active', '')
     
-    # Query base
-    corpus_list = JSONCorpus.objects.all().order_by('-created_at')
+    # Query base: solo las columnas que pinta el partial
+    # (description y metadatos de auditoría quedan diferidos)
+    corpus_list = JSONCorpus.objects.only(
+        'id', 'name', 'corpus_type', 'version', 'records_count',
+        'file_size', 'is_active', 'file', 'created_at',
+    ).order_by('-created_at')
     
     # Aplicar filtros
     if corpus_type:
@@ -138,8 +294,14 @@ def admin_corpus(request):
     if is_active:
         corpus_list = corpus_list.filter(is_active=(is_active == 'true'))
     
+    # Resultado acotado a 25 filas por página aunque la tabla crezca
+    page_obj = _paginate(
+        request, corpus_list, 'admin_corpus_count', (corpus_type, is_active)
+    )
+    
     context = {
-        'corpus_list': corpus_list,
+        'corpus_list': page_obj,
+        'page_obj': page_obj,
         'section': 'corpus',
         'filters': {
             'corpus_type': corpus_type,
@@ -151,8 +313,6 @@ def admin_corpus(request):
 
 def admin_corpus_upload(request):
     """Subir nuevo corpus JSON."""
-    from myapp.models import JSONCorpus
-    import json
     
     if request.method == 'POST':
         try:
@@ -165,12 +325,12 @@ def admin_corpus_upload(request):
             
             # Validar que el archivo sea JSON válido
             if file:
-                content = file.read().decode('utf-8')
-                data = json.loads(content)  # Validar JSON
-                file.seek(0)  # Resetear para guardarlo
-                
-                # Contar registros
-                num_records = len(data) if isinstance(data, list) else 1
+                # Validar y contar en streaming: evita materializar el
+                # JSON completo (bytes → str → objetos) solo para un len()
+                num_records = _count_json_records(file)
+                # Precalcular la vista previa una sola vez al subir:
+                # admin_corpus_view la lee de la columna sin abrir el archivo
+                preview = _json_preview(file)
             else:
                 messages.error(request, 'Debe seleccionar un archivo')
                 return redirect('admin_corpus_upload')
@@ -183,114 +343,139 @@ def admin_corpus_upload(request):
                 version=version,
                 file=file,
                 records_count=num_records,
+                preview_json=preview,
                 file_size=file.size,
                 is_active=is_active,
                 created_by='admin'
             )
             
+            cache.delete(DASHBOARD_STATS_CACHE_KEY)
+            
             messages.success(request, f'✓ Corpus "{name}" creado exitosamente')
             return redirect('admin_corpus')
             
-        except json.JSONDecodeError:
+        except ValueError:
             messages.error(request, 'El archivo no es un JSON válido')
         except Exception as e:
             messages.error(request, f'Error al crear corpus: {str(e)}')
-            print(f"Error en admin_corpus_upload: {e}", flush=True)
+            logger.error("Error en admin_corpus_upload: %s", e)
     
     return render_partial_or_base(request, 'admin_corpus_upload', {})
 
 
 def admin_corpus_view(request, pk):
     """Ver detalles de un corpus."""
-    from myapp.models import JSONCorpus
-    
-    try:
-        corpus = JSONCorpus.objects.get(pk=pk)
-        
-        # Preview del contenido JSON
-        preview_data = None
-        if corpus.file:
-            try:
-                import json
-                with corpus.file.open('r') as f:
-                    data = json.load(f)
-                    if isinstance(data, list):
-                        preview_data = data[:3]  # Primeros 3 elementos
-                    else:
-                        preview_data = data
-            except Exception as e:
-                print(f"Error al cargar preview: {e}", flush=True)
-        
-        context = {
-            'corpus': corpus,
-            'preview_data': preview_data,
-            'section': 'corpus',
-        }
-        return render_partial_or_base(request, 'admin_corpus_view', context)
-        
-    except JSONCorpus.DoesNotExist:
-        messages.error(request, 'Corpus no encontrado')
-        return redirect('admin_corpus')
+
+    corpus = get_object_or_404(
+        JSONCorpus.objects.only(
+            'id', 'name', 'corpus_type', 'description', 'version',
+            'is_active', 'file', 'records_count', 'file_size',
+            'compression', 'preview_json', 'created_at', 'created_by',
+        ),
+        pk=pk,
+    )
+
+    # Preview del contenido JSON: precalculada al subir; los corpus
+    # anteriores a la columna caen al camino de lectura bajo demanda
+    preview_data = corpus.preview_json
+    if preview_data is None and corpus.file:
+        try:
+            if corpus.compression:
+                # Corpus comprimido en reposo: descomprimir vía el
+                # servicio en lugar de parsear los bytes en crudo
+                content, error = FileManagerService.load_json_content(corpus)
+                if error:
+                    raise ValueError(error)
+                preview_data = content[:3] if isinstance(content, list) else content
+            else:
+                # Solo se muestran 3 registros: el parseo en streaming
+                # corta en cuanto los tiene, sin cargar el archivo entero
+                with corpus.file.open('rb') as f:
+                    try:
+                        import ijson
+                        preview_data = list(islice(ijson.items(f, 'item'), 3))
+                        if not preview_data:
+                            # Raíz no-lista (u objeto vacío): cargar completo
+                            f.seek(0)
+                            preview_data = json.load(f)
+                    except ImportError:
+                        f.seek(0)
+                        data = json.load(f)
+                        preview_data = data[:3] if isinstance(data, list) else data
+        except Exception as e:
+            logger.warning("Error al cargar preview: %s", e)
+
+    context = {
+        'corpus': corpus,
+        'preview_data': preview_data,
+        'section': 'corpus',
+    }
+    return render_partial_or_base(request, 'admin_corpus_view', context)
 
 
 def admin_corpus_edit(request, pk):
     """Editar un corpus."""
-    from myapp.models import JSONCorpus
-    import json
-    
-    try:
-        corpus = JSONCorpus.objects.get(pk=pk)
-        
-        if request.method == 'POST':
-            try:
-                corpus.name = request.POST.get('name', corpus.name)
-                corpus.corpus_type = request.POST.get('corpus_type', corpus.corpus_type)
-                corpus.description = request.POST.get('description', corpus.description)
-                corpus.version = request.POST.get('version', corpus.version)
-                corpus.is_active = request.POST.get('is_active') == 'on'
-                
-                # Si hay nuevo archivo
-                new_file = request.FILES.get('file')
-                if new_file:
-                    # Validar JSON
-                    content = new_file.read().decode('utf-8')
-                    data = json.loads(content)
-                    new_file.seek(0)
-                    
-                    corpus.file = new_file
-                    corpus.records_count = len(data) if isinstance(data, list) else 1
-                    corpus.file_size = new_file.size
-                
-                corpus.save()
-                messages.success(request, f'✓ Corpus "{corpus.name}" actualizado')
-                return redirect('admin_corpus_view', pk=pk)
-                
-            except json.JSONDecodeError:
-                messages.error(request, 'El archivo no es un JSON válido')
-            except Exception as e:
-                messages.error(request, f'Error al actualizar: {str(e)}')
-                print(f"Error en admin_corpus_edit: {e}", flush=True)
-        
-        context = {
-            'corpus': corpus,
-            'section': 'corpus',
-        }
-        return render_partial_or_base(request, 'admin_corpus_edit', context)
-        
-    except JSONCorpus.DoesNotExist:
-        messages.error(request, 'Corpus no encontrado')
-        return redirect('admin_corpus')
+
+    corpus = get_object_or_404(JSONCorpus, pk=pk)
+
+    if request.method == 'POST':
+        try:
+            corpus.name = request.POST.get('name', corpus.name)
+            corpus.corpus_type = request.POST.get('corpus_type', corpus.corpus_type)
+            corpus.description = request.POST.get('description', corpus.description)
+            corpus.version = request.POST.get('version', corpus.version)
+            corpus.is_active = request.POST.get('is_active') == 'on'
+            # Escribir solo las columnas del formulario; las del
+            # archivo se añaden únicamente si se reemplazó
+            update_fields = [
+                'name', 'corpus_type', 'description', 'version',
+                'is_active', 'updated_at',
+            ]
+
+            # Si hay nuevo archivo
+            new_file = request.FILES.get('file')
+            if new_file:
+                # Validar y contar en streaming (deja el puntero al inicio)
+                num_records = _count_json_records(new_file)
+
+                corpus.file = new_file
+                corpus.records_count = num_records
+                corpus.preview_json = _json_preview(new_file)
+                corpus.file_size = new_file.size
+                update_fields += [
+                    'file', 'records_count', 'preview_json', 'file_size',
+                ]
+
+            corpus.save(update_fields=update_fields)
+            messages.success(request, f'✓ Corpus "{corpus.name}" actualizado')
+            return redirect('admin_corpus_view', pk=pk)
+
+        except ValueError:
+            messages.error(request, 'El archivo no es un JSON válido')
+        except Exception as e:
+            messages.error(request, f'Error al actualizar: {str(e)}')
+            logger.error("Error en admin_corpus_edit: %s", e)
+
+    context = {
+        'corpus': corpus,
+        'section': 'corpus',
+    }
+    return render_partial_or_base(request, 'admin_corpus_edit', context)
 
 
 def admin_corpus_toggle(request, pk):
     """Activar/Desactivar corpus."""
-    from myapp.models import JSONCorpus
     
     if request.method == 'POST':
         try:
-            corpus = JSONCorpus.objects.get(pk=pk)
-            corpus.is_active = not corpus.is_active
-            corpus.save()
+            # SELECT ... FOR UPDATE dentro de la transacción: dos toggles
+            # concurrentes se serializan en vez de pisarse el read-modify-write
+            with transaction.atomic():
+                corpus = JSONCorpus.objects.select_for_update().get(pk=pk)
+                corpus.is_active = not corpus.is_active
+                # UPDATE de dos columnas en lugar de reescribir toda la fila
+                # (updated_at explícito para que auto_now se persista)
+                corpus.save(update_fields=['is_active', 'updated_at'])
             
             status = 'activado' if corpus.is_active else 'desactivado'
             messages.success(request, f'✓ Corpus "{corpus.name}" {status}')
@@ -305,13 +490,18 @@ def admin_corpus_toggle(request, pk):
 
 def admin_corpus_delete(request, pk):
     """Eliminar corpus."""
-    from myapp.models import JSONCorpus
     
     if request.method == 'POST':
         try:
-            corpus = JSONCorpus.objects.get(pk=pk)
-            name = corpus.name
-            corpus.delete()
+            # El borrado en cascada (versiones, archivo) se confirma o
+            # revierte como una sola unidad
+            with transaction.atomic():
+                corpus = JSONCorpus.objects.get(pk=pk)
+                name = corpus.name
+                corpus.delete()
+
+            cache.delete(DASHBOARD_STATS_CACHE_KEY)
+            
             messages.success(request, f'✓ Corpus "{name}" eliminado')
             
         except JSONCorpus.DoesNotExist:
@@ -324,16 +514,32 @@ def admin_corpus_delete(request, pk):
 
 def admin_pdf(request):
     """Lista de PDFs."""
+    tag = request.GET.get('tag', '')
+    
     try:
-        from myapp.models import PDFDocument
-        pdf_list = PDFDocument.objects.all().order_by('-created_at')
+        # El filtro por etiqueta entra por el seam PDFDocument.tagged():
+        # si tags migra a ArrayField + GIN solo cambia esa implementación
+        base = PDFDocument.tagged(tag) if tag else PDFDocument.objects.all()
+        # related_corpus es la única FK del modelo: el JOIN evita una
+        # consulta extra por fila si el partial la toca; only() recorta
+        # la fila a las columnas que realmente se muestran
+        pdf_list = base.select_related('related_corpus').only(
+            'id', 'title', 'document_type', 'status', 'is_public',
+            'file', 'file_size', 'created_at',
+            'related_corpus__id', 'related_corpus__name',
+        ).order_by('-created_at')
+        page_obj = _paginate(request, pdf_list, 'admin_pdf_count', (tag,))
     except Exception as e:
-        print(f"Error al cargar PDFs: {e}")
-        pdf_list = []
+        logger.error("Error al cargar PDFs: %s", e)
+        page_obj = []
     
     context = {
-        'pdf_list': pdf_list,
+        'pdf_list': page_obj,
+        'page_obj': page_obj,
         'section': 'pdf',
+        'filters': {
+            'tag': tag,
+        }
     }
     return render_partial_or_base(request, 'admin_pdf', context)
 
@@ -342,10 +548,6 @@ def admin_pdf_upload(request):
     """Subir nuevo PDF."""
     if request.method == 'POST':
         try:
-            from myapp.models import PDFDocument
-            from myapp.services.document_service import DocumentService
-            from myapp.services.vectordb_service import VectorDBService
-            import os
             
             # Obtener datos del formulario
             title = request.POST.get('title')
@@ -371,19 +573,28 @@ def admin_pdf_upload(request):
             )
             
             # Guardar también en carpeta docs/ para la vectordb
-            doc_service = DocumentService()
+            doc_service = get_document_service()
             doc_service.save_uploaded_files([file])
             
-            # Regenerar base vectorial
-            pdf_files = doc_service.get_existing_documents()
-            vectordb_service = VectorDBService()
-            vectordb_service.get_vectorstore(pdf_files, force_regenerate=True)
+            # Regenerar la base vectorial en segundo plano: la petición
+            # no retiene el worker durante la indexación
+            
+            pdf_id = pdf_doc.id
             
-            # Marcar como procesado
-            pdf_doc.processed_for_vectordb = True
-            pdf_doc.save()
+            def _marcar_procesado():
+                PDFDocument.objects.filter(id=pdf_id).update(
+                    processed_for_vectordb=True
+                )
+            
+            dispatch_vectorstore_regeneration(on_done=_marcar_procesado)
             
-            messages.success(request, f'Documento "{title}" subido correctamente')
+            cache.delete(DASHBOARD_STATS_CACHE_KEY)
+            
+            messages.success(
+                request,
+                f'Documento "{title}" subido correctamente; '
+                'se está indexando en segundo plano'
+            )
             return redirect('admin_pdf')
             
         except Exception as e:
@@ -395,49 +606,57 @@ def admin_pdf_upload(request):
 
 def admin_pdf_view(request, pk=None):
     """Ver detalles de un PDF."""
-    try:
-        from myapp.models import PDFDocument
-        pdf = PDFDocument.objects.get(pk=pk)
-        context = {'pk': pk, 'pdf': pdf}
-    except:
-        context = {'pk': pk, 'pdf': None}
-    return render_partial_or_base(request, 'admin_pdf_view', context)
+    # get_object_or_404 en lugar del except desnudo: un 404 normal es más
+    # barato que construir el traceback y no enmascara errores reales
+    pdf = get_object_or_404(
+        PDFDocument.objects.only(
+            'id', 'title', 'document_type', 'description', 'status',
+            'is_public', 'processed_for_vectordb', 'file', 'file_size',
+            'created_at', 'updated_at',
+        ),
+        pk=pk,
+    )
+    return render_partial_or_base(request, 'admin_pdf_view', {'pk': pk, 'pdf': pdf})
 
 
 def admin_pdf_edit(request, pk=None):
     """Editar un PDF."""
-    try:
-        from myapp.models import PDFDocument
-        pdf = PDFDocument.objects.get(pk=pk)
-        
-        if request.method == 'POST':
+    pdf = get_object_or_404(PDFDocument, pk=pk)
+
+    if request.method == 'POST':
+        try:
             # Actualizar campos
             pdf.title = request.POST.get('title', pdf.title)
             pdf.document_type = request.POST.get('document_type', pdf.document_type)
             pdf.description = request.POST.get('description', pdf.description)
             pdf.status = request.POST.get('status', pdf.status)
             pdf.is_public = request.POST.get('is_public') == 'on'
-            pdf.save()
-            
+            # Escribir solo las columnas del formulario
+            pdf.save(update_fields=[
+                'title', 'document_type', 'description', 'status',
+                'is_public', 'updated_at',
+            ])
+
             messages.success(request, f'Documento "{pdf.title}" actualizado correctamente')
             return redirect('admin_pdf')
-        
-        context = {'pk': pk, 'pdf': pdf}
-    except Exception as e:
-        messages.error(request, f'Error: {str(e)}')
-        context = {'pk': pk, 'pdf': None}
-    
-    return render_partial_or_base(request, 'admin_pdf_edit', context)
+        except Exception as e:
+            messages.error(request, f'Error: {str(e)}')
+
+    return render_partial_or_base(request, 'admin_pdf_edit', {'pk': pk, 'pdf': pdf})
 
 
 def admin_pdf_delete(request, pk):
     """Eliminar un PDF."""
     if request.method == 'POST':
         try:
-            from myapp.models import PDFDocument
-            pdf = PDFDocument.objects.get(pk=pk)
-            title = pdf.title
-            pdf.delete()
+            # Mismo criterio que admin_corpus_delete: el borrado en
+            # cascada se confirma o revierte como una sola unidad
+            with transaction.atomic():
+                pdf = PDFDocument.objects.get(pk=pk)
+                title = pdf.title
+                pdf.delete()
+
+            cache.delete(DASHBOARD_STATS_CACHE_KEY)
             
             messages.success(request, f'Documento "{title}" eliminado correctamente')
         except Exception as e:
@@ -448,16 +667,17 @@ def admin_pdf_delete(request, pk):
 
 def admin_messages(request):
     """Historial de mensajes del chatbot."""
-    from myapp.models import ChatMessage
-    from django.db.models import Count
     
     # Obtener filtros
     session_key = request.GET.get('session', '')
     role = request.GET.get('role', '')
     search = request.GET.get('search', '')
     
-    # Query base
-    messages_list = ChatMessage.objects.all().order_by('-created_at')
+    # Query base; content se mantiene completo porque el modal de
+    # detalle lo muestra entero, pero se difiere el resto de columnas
+    messages_list = ChatMessage.objects.only(
+        'id', 'session_key', 'role', 'content', 'created_at',
+    ).order_by('-created_at')
     
     # Aplicar filtros
     if session_key:
@@ -469,24 +689,43 @@ def admin_messages(request):
     if search:
         messages_list = messages_list.filter(content__icontains=search)
     
-    # Limitar a los últimos 100 mensajes para no sobrecargar
-    messages_list = messages_list[:100]
+    # Paginación en lugar del corte fijo a 100: todo el historial es
+    # navegable y cada página queda acotada a 25 filas
+    page_obj = _paginate(
+        request, messages_list, 'admin_messages_count',
+        (session_key, role, search),
+    )
     
-    # Obtener lista de sesiones únicas para el filtro
-    sessions = ChatMessage.objects.values('session_key').annotate(
-        message_count=Count('id')
-    ).order_by('-message_count')[:20]
-    
-    # Estadísticas
+    # Obtener lista de sesiones únicas para el filtro; el GROUP BY
+    # recorre toda la tabla, así que el top-20 se cachea unos segundos
+    # (.values() ya evita construir instancias de modelo por fila)
+    sessions = cache.get_or_set(
+        'admin_messages_sessions',
+        lambda: list(
+            ChatMessage.objects.values('session_key').annotate(
+                message_count=Count('id')
+            ).order_by('-message_count')[:20]
+        ),
+        30,
+    )
+
+    # Estadísticas: un solo agregado en lugar de cuatro escaneos de la tabla
+    totals = ChatMessage.objects.aggregate(
+        total=Count('id'),
+        sessions=Count('session_key', distinct=True),
+        humans=Count('id', filter=Q(role='human')),
+        ais=Count('id', filter=Q(role='ai')),
+    )
     stats = {
-        'total_messages': ChatMessage.objects.count(),
-        'total_sessions': ChatMessage.objects.values('session_key').distinct().count(),
-        'human_messages': ChatMessage.objects.filter(role='human').count(),
-        'ai_messages': ChatMessage.objects.filter(role='ai').count(),
+        'total_messages': totals['total'],
+        'total_sessions': totals['sessions'],
+        'human_messages': totals['humans'],
+        'ai_messages': totals['ais'],
     }
     
     context = {
-        'messages_list': messages_list,
+        'messages_list': page_obj,
+        'page_obj': page_obj,
         'sessions': sessions,
         'stats': stats,
         'filters': {
@@ -501,28 +740,77 @@ def admin_messages(request):
 
 def admin_messages_clear(request):
     """Limpiar todos los mensajes del historial."""
-    from myapp.models import ChatMessage
     
     if request.method == 'POST':
         try:
-            count = ChatMessage.objects.count()
-            ChatMessage.objects.all().delete()
+            # delete() ya devuelve el conteo por modelo: un round-trip
+            # en lugar de COUNT + DELETE separados; la transacción evita
+            # dejar un historial borrado a medias si el DELETE falla
+            with transaction.atomic():
+                _, per_model = ChatMessage.objects.all().delete()
+            count = per_model.get('myapp.ChatMessage', 0)
+            
+            cache.delete(DASHBOARD_STATS_CACHE_KEY)
+            
             messages.success(request, f'✓ {count} mensajes eliminados correctamente')
-            print(f"Se eliminaron {count} mensajes del historial", flush=True)
+            logger.info("Se eliminaron %s mensajes del historial", count)
         except Exception as e:
             messages.error(request, f'Error al eliminar mensajes: {str(e)}')
-            print(f"Error al eliminar mensajes: {e}", flush=True)
+            logger.error("Error al eliminar mensajes: %s", e)
     
     return redirect('admin_messages')
 
 
+@require_http_methods(["POST"])
+def admin_messages_clear_bulk(request):
+    """
+    Elimina el historial de varias sesiones en una sola sentencia.
+    Recibe {"sessions": [...]} en el cuerpo; session_key__in emite un
+    único DELETE ... WHERE session_key IN (...) — un round-trip y una
+    transacción, sin un DELETE por sesión.
+    """
+    try:
+        payload = json.loads(request.body or b'{}')
+        keys = payload.get('sessions')
+        if not isinstance(keys, list) or not keys:
+            return JsonResponse({
+                'success': False,
+                'error': 'Se requiere una lista "sessions" no vacía'
+            }, status=400)
+
+        with transaction.atomic():
+            _, per_model = ChatMessage.objects.filter(
+                session_key__in=keys
+            ).delete()
+        count = per_model.get('myapp.ChatMessage', 0)
+
+        cache.delete(DASHBOARD_STATS_CACHE_KEY)
+
+        logger.info(
+            "Se eliminaron %s mensajes de %s sesiones", count, len(keys)
+        )
+        return JsonResponse({
+            'success': True,
+            'messages_deleted': count,
+            'sessions': len(keys),
+        })
+
+    except json.JSONDecodeError:
+        return JsonResponse({
+            'success': False,
+            'error': 'Cuerpo JSON inválido'
+        }, status=400)
+    except Exception as e:
+        logger.error("Error en limpieza masiva de sesiones: %s", e)
+        return JsonResponse({'success': False, 'error': str(e)}, status=500)
+
+
 def admin_scraping(request):
     """Vista de scraping con historial."""
     try:
-        from myapp.models import ScrapingLog
         logs = ScrapingLog.objects.all().order_by('-executed_at')[:20]
     except Exception as e:
-        print(f"Error al cargar logs: {e}")
+        logger.error("Error al cargar logs: %s", e)
         logs = []
     
     context = {
@@ -534,94 +822,58 @@ def admin_scraping(request):
 
 def admin_run_scraping(request):
     """Ejecutar scraping de becas."""
-    import logging
-    logger = logging.getLogger(__name__)
-    
-    print("\n" + "="*60, flush=True)
-    print("VISTA admin_run_scraping EJECUTADA", flush=True)
-    print(f"Método: {request.method}", flush=True)
-    print("="*60 + "\n", flush=True)
-    
-    logger.info("="*60)
-    logger.info("VISTA admin_run_scraping EJECUTADA")
-    logger.info(f"Método: {request.method}")
-    logger.info("="*60)
+    logger.info("Vista admin_run_scraping ejecutada (método %s)", request.method)
     
     if request.method == 'POST':
         try:
-            print("Iniciando proceso de scraping...", flush=True)
-            logger.info("Iniciando proceso de scraping...")
             
-            from myapp.services.scraper_service import ScraperService
-            from myapp.services.vectordb_service import VectorDBService
-            from myapp.services.document_service import DocumentService
-            from myapp.models import ScrapingLog
+            # El scraping y la regeneración de la base vectorial tardan
+            # decenas de segundos: se lanzan en segundo plano y la vista
+            # responde de inmediato sin retener el worker ni la conexión
+            log_id = dispatch_scraping()
+            logger.info("Scraping lanzado en segundo plano (log %s)", log_id)
             
-            scraper_service = ScraperService()
-            
-            # Ejecutar scraping
-            print("Llamando a scraper_service.scrape_becas()...", flush=True)
-            logger.info("Llamando a scraper_service.scrape_becas()...")
-            success, num_becas, error_msg = scraper_service.scrape_becas()
-            print(f"Scraping completado: success={success}, num_becas={num_becas}", flush=True)
-            logger.info(f"Scraping completado: success={success}, num_becas={num_becas}")
-            
-            # Guardar log
-            log_entry = ScrapingLog.objects.create(
-                success=success,
-                num_becas=num_becas,
-                error_message=error_msg if not success else None
+            messages.info(
+                request,
+                '⏳ Actualización iniciada en segundo plano; '
+                'el historial mostrará el resultado al terminar'
             )
-            print(f"Log guardado con ID: {log_entry.id}", flush=True)
-            logger.info(f"Log guardado con ID: {log_entry.id}")
-            
-            if success:
-                # Regenerar base vectorial con el nuevo corpus
-                print("Regenerando base vectorial...", flush=True)
-                logger.info("Regenerando base vectorial...")
-                doc_service = DocumentService()
-                pdf_files = doc_service.get_existing_documents()
-                vectordb_service = VectorDBService()
-                vectordb_service.get_vectorstore(pdf_files, force_regenerate=True)
-                print("Base vectorial regenerada", flush=True)
-                logger.info("Base vectorial regenerada")
-                
-                messages.success(request, f'✓ Actualización exitosa: {num_becas} becas procesadas')
-            else:
-                print(f"Error en scraping: {error_msg}", flush=True)
-                logger.error(f"Error en scraping: {error_msg}")
-                messages.error(request, f'✗ Error al actualizar: {error_msg}')
             
         except Exception as e:
-            print(f"Excepción en admin_run_scraping: {str(e)}", flush=True)
-            logger.error(f"Excepción en admin_run_scraping: {str(e)}", exc_info=True)
+            logger.error("Excepción en admin_run_scraping: %s", e, exc_info=True)
             messages.error(request, f'Error: {str(e)}')
     
-    print("Redirigiendo a admin_scraping\n", flush=True)
-    logger.info("Redirigiendo a admin_scraping")
     return redirect('admin_scraping')
 
-from django.shortcuts import render, redirect
-from django.http import JsonResponse
-from django.views.decorators.http import require_http_methods
-from django.contrib import messages
-import json
-
-from myapp.forms import ChatForm, DocumentUploadForm
-from myapp.models import ChatMessage, UploadedDocument, ScrapingLog
-from myapp.services.chat_service import ChatService
-from myapp.services.vectordb_service import VectorDBService
-from myapp.services.document_service import DocumentService
-from myapp.services.scraper_service import ScraperService
 
+def admin_scraping_status(request, pk):
+    """Estado de una ejecución de scraping (sondeo AJAX)."""
+    
+    try:
+        log = ScrapingLog.objects.only(
+            'status', 'num_becas', 'error_message'
+        ).get(pk=pk)
+    except ScrapingLog.DoesNotExist:
+        return JsonResponse({
+            'success': False,
+            'error': 'Log no encontrado'
+        }, status=404)
+    
+    return JsonResponse({
+        'success': True,
+        'status': log.status,
+        'finished': log.status in ('success', 'error'),
+        'num_becas': log.num_becas,
+        'error_message': log.error_message,
+    })
 
 def home(request):
     """
     Vista principal del chatbot.
     Renderiza el template existente con la interfaz UTPL.
     """
-    # Inicializar servicios
-    scraper_service = ScraperService()
+    # Inicializar servicios (instancia compartida del proceso)
+    scraper_service = get_scraper_service()
     
     # Obtener o crear session_key
     if not request.session.session_key:
@@ -630,17 +882,18 @@ def home(request):
     # Verificar si existe corpus de becas
     corpus_info = scraper_service.get_corpus_info()
     
-    # Si no existe el corpus, crearlo automáticamente
+    # Si no existe el corpus, crearlo automáticamente en segundo plano
+    # para no bloquear la primera carga de la página
     if not corpus_info:
         try:
-            success, num_becas, error_msg = scraper_service.scrape_becas()
-            if success:
-                ScrapingLog.objects.create(
-                    success=True,
-                    num_becas=num_becas
-                )
+            # Evitar la estampida de primeras visitas: si ya hay un
+            # scraping en cola o en curso no se lanza otro
+            if not ScrapingLog.objects.filter(
+                status__in=('pending', 'running')
+            ).exists():
+                dispatch_scraping()
         except Exception as e:
-            print(f"⚠️ Error al crear corpus inicial: {e}")
+            logger.warning("⚠️ Error al crear corpus inicial: %s", e)
     
     # Renderizar el template existente
     return render(request, 'index.html')
@@ -668,10 +921,9 @@ def send_message(request):
             request.session.create()
         session_key = request.session.session_key
         
-        # Inicializar servicios
-        chat_service = ChatService()
-        vectordb_service = VectorDBService()
-        doc_service = DocumentService()
+        # Servicios compartidos del proceso (ver myapp/services/__init__)
+        vectordb_service = get_vectordb_service()
+        doc_service = get_document_service()
         
         # Obtener vectordb
         pdf_files = doc_service.get_existing_documents()
@@ -683,10 +935,11 @@ def send_message(request):
                 'error': 'No se pudo inicializar la base de conocimiento'
             }, status=500)
         
-        # Obtener historial previo
-        previous_messages = ChatMessage.objects.filter(
-            session_key=session_key
-        ).order_by('created_at')
+        # Obtener historial previo (solo las columnas usadas en el prompt;
+        # el filtro usa el hash BIGINT indexado de la sesión)
+        previous_messages = ChatMessage.for_session(
+            session_key
+        ).order_by('created_at').only('role', 'content')
         
         # Convertir a formato LangChain
         langchain_history = chat_service.convert_to_langchain_messages([
@@ -694,29 +947,17 @@ def send_message(request):
             for msg in previous_messages
         ])
         
-        # Obtener chain en caché si existe
-        cached_chain = request.session.get('retrieval_chain')
-        
-        # Generar respuesta
+        # Generar respuesta: la cadena RAG vive memoizada dentro de
+        # ChatService (nada de serializarla en la sesión por petición)
         response, context_docs = chat_service.get_response(
             question=message,
             chat_history=langchain_history,
             vectordb=vectordb,
-            retrieval_chain=cached_chain
-        )
-        
-        # Guardar mensajes en la base de datos
-        ChatMessage.objects.create(
-            session_key=session_key,
-            role='human',
-            content=message
         )
         
-        ChatMessage.objects.create(
-            session_key=session_key,
-            role='ai',
-            content=response
-        )
+        # Guardar el turno completo en un solo INSERT multi-fila
+        # (bulk_create es atómico: ambas filas entran o ninguna)
+        ChatMessage.log_turn(session_key, message, response)
         
         # Extraer información de fuentes
         sources = chat_service.extract_source_info(context_docs)
@@ -728,25 +969,88 @@ def send_message(request):
         })
     
     except Exception as e:
-        # Log del error para debugging
-        import traceback
-        error_trace = traceback.format_exc()
-        print(f"❌ ERROR en send_message: {str(e)}")
-        print(error_trace)
-        
+        # logger.exception ya deja el traceback completo en el log; en
+        # la respuesta solo viaja con DEBUG (formatearlo lee código
+        # fuente de disco y en producción nadie lo consume)
+        logger.exception("❌ ERROR en send_message: %s", e)
+
+        payload = {'success': False, 'error': f'Error del servidor: {str(e)}'}
+        if settings.DEBUG:
+            payload['trace'] = traceback.format_exc()
+        return JsonResponse(payload, status=500)
+
+
+@require_http_methods(["POST"])
+async def send_message_stream(request):
+    """
+    Variante en streaming de send_message.
+    Devuelve la respuesta como texto plano por fragmentos (el navegador
+    la recibe con la latencia del primer token); al terminar persiste el
+    turno completo en la base de datos.
+    """
+
+    form = ChatForm(request.POST)
+    if not form.is_valid():
         return JsonResponse({
             'success': False,
-            'error': f'Error del servidor: {str(e)}',
-            'trace': error_trace if request.user.is_authenticated else None
+            'error': 'Mensaje inválido'
+        }, status=400)
+
+    message = form.cleaned_data['message']
+
+    if not request.session.session_key:
+        await sync_to_async(request.session.create)()
+    session_key = request.session.session_key
+
+    vectordb_service = get_vectordb_service()
+    doc_service = get_document_service()
+
+    pdf_files = doc_service.get_existing_documents()
+    vectordb = await sync_to_async(vectordb_service.get_vectorstore)(
+        pdf_files, force_regenerate=False
+    )
+
+    if not vectordb:
+        return JsonResponse({
+            'success': False,
+            'error': 'No se pudo inicializar la base de conocimiento'
         }, status=500)
 
+    history_rows = await sync_to_async(list)(
+        ChatMessage.for_session(session_key)
+        .order_by('created_at').only('role', 'content')
+    )
+    langchain_history = chat_service.convert_to_langchain_messages([
+        {'role': msg.role, 'content': msg.content}
+        for msg in history_rows
+    ])
+
+    async def stream():
+        parts = []
+        async for piece in chat_service.get_response_stream(
+            question=message,
+            chat_history=langchain_history,
+            vectordb=vectordb,
+        ):
+            parts.append(piece)
+            yield piece
+        # Persistir el turno una vez emitida la respuesta completa
+        await sync_to_async(ChatMessage.log_turn)(
+            session_key, message, ''.join(parts)
+        )
+
+    return StreamingHttpResponse(stream(), content_type='text/plain; charset=utf-8')
+
 
 @require_http_methods(["GET"])
 def get_chat_history(request):
     """
     Retorna el historial de chat de la sesión actual.
     Útil para cargar mensajes previos al abrir el chat.
+    La respuesta se emite en streaming con el mismo formato JSON:
+    memoria constante aunque el historial sea largo.
     """
+    
     if not request.session.session_key:
         return JsonResponse({
             'success': True,
@@ -754,23 +1058,26 @@ def get_chat_history(request):
         })
     
     session_key = request.session.session_key
-    messages_qs = ChatMessage.objects.filter(
-        session_key=session_key
-    ).order_by('created_at')
-    
-    messages_data = [
-        {
-            'role': msg.role,
-            'content': msg.content,
-            'created_at': msg.created_at.strftime('%Y-%m-%d %H:%M:%S')
-        }
-        for msg in messages_qs
-    ]
+    messages_qs = ChatMessage.for_session(
+        session_key
+    ).order_by('created_at').only('role', 'content', 'created_at')
     
-    return JsonResponse({
-        'success': True,
-        'messages': messages_data
-    })
+    def stream():
+        yield '{"success": true, "messages": ['
+        first = True
+        # iterator() sirve el historial en lotes de 500 filas sin
+        # materializar la lista completa ni la caché del queryset
+        for msg in messages_qs.iterator(chunk_size=500):
+            prefix = '' if first else ','
+            first = False
+            yield prefix + json.dumps({
+                'role': msg.role,
+                'content': msg.content,
+                'created_at': msg.created_at.strftime('%Y-%m-%d %H:%M:%S')
+            })
+        yield ']}'
+    
+    return StreamingHttpResponse(stream(), content_type='application/json')
 
 
 @require_http_methods(["POST"])
@@ -791,7 +1098,7 @@ def upload_documents(request):
         return redirect('home')
     
     # Procesar archivos
-    doc_service = DocumentService()
+    doc_service = get_document_service()
     result = doc_service.save_uploaded_files(files)
     
     # Guardar registro en BD
@@ -799,33 +1106,36 @@ def upload_documents(request):
         request.session.create()
     session_key = request.session.session_key
     
-    for filename in result['saved_files']:
-        UploadedDocument.objects.create(
+    # Un solo INSERT multi-fila para todos los registros de la subida
+    UploadedDocument.objects.bulk_create([
+        UploadedDocument(
             session_key=session_key,
             filename=filename,
             file_path=f"docs/{filename}",
             processed=False
         )
+        for filename in result['saved_files']
+    ], batch_size=100)
     
-    # Regenerar base vectorial
+    # Regenerar base vectorial en segundo plano
     if result['saved_files']:
-        vectordb_service = VectorDBService()
-        pdf_files = doc_service.get_existing_documents()
-        vectordb = vectordb_service.get_vectorstore(pdf_files, force_regenerate=True)
+        saved_files = list(result['saved_files'])
         
-        # Marcar como procesados
-        UploadedDocument.objects.filter(
-            session_key=session_key,
-            filename__in=result['saved_files']
-        ).update(processed=True)
+        def _marcar_procesados():
+            UploadedDocument.objects.filter(
+                session_key=session_key,
+                filename__in=saved_files
+            ).update(processed=True)
         
-        # Limpiar chain en caché
-        if 'retrieval_chain' in request.session:
-            del request.session['retrieval_chain']
+        dispatch_vectorstore_regeneration(on_done=_marcar_procesados)
+        
+        # Limpiar las cadenas memoizadas del proceso
+        chat_service.invalidate_chains()
         
         messages.success(
             request,
-            f"{len(result['saved_files'])} archivo(s) procesado(s) correctamente"
+            f"{len(result['saved_files'])} archivo(s) guardado(s); "
+            "la base de conocimiento se actualizará en segundo plano"
         )
     
     if result['skipped_files']:
@@ -846,28 +1156,33 @@ def update_becas(request):
     """
     Ejecuta el web scraping para actualizar información de becas.
     """
+    # Instancia propia, no el singleton: el driver de Selenium que la
+    # instancia cachea no es compartible entre peticiones concurrentes
+    from myapp.services.scraper_service import ScraperService
     scraper_service = ScraperService()
     
     try:
         success, num_becas, error_msg = scraper_service.scrape_becas()
         
-        # Registrar en log
+        # Registrar en log (ya terminado: el estado se fija de una vez)
         ScrapingLog.objects.create(
             success=success,
             num_becas=num_becas,
-            error_message=error_msg
+            error_message=error_msg,
+            status='success' if success else 'error',
         )
-        
+
         if success:
-            # Regenerar base vectorial
-            doc_service = DocumentService()
-            vectordb_service = VectorDBService()
+            # Actualización incremental: el manifiesto por hash de
+            # contenido detecta si el scraping cambió algo de verdad;
+            # con el corpus idéntico no se re-embebe nada
+            doc_service = get_document_service()
+            vectordb_service = get_vectordb_service()
             pdf_files = doc_service.get_existing_documents()
-            vectordb_service.get_vectorstore(pdf_files, force_regenerate=True)
+            vectordb_service.update_vectorstore(pdf_files)
             
-            # Limpiar chain en caché
-            if 'retrieval_chain' in request.session:
-                del request.session['retrieval_chain']
+            # Limpiar las cadenas memoizadas del proceso
+            chat_service.invalidate_chains()
             
             messages.success(
                 request,
@@ -898,21 +1213,18 @@ def clear_chat(request):
 
         session_key = request.session.session_key
         
-        # Contar mensajes antes de eliminar
-        count = ChatMessage.objects.filter(session_key=session_key).count()
-        
-        # Eliminar mensajes de esta sesión
-        ChatMessage.objects.filter(session_key=session_key).delete()
+        # Eliminar mensajes de esta sesión; delete() devuelve el conteo,
+        # así que sobra el COUNT previo (mismo criterio que
+        # admin_messages_clear, incluida la transacción)
+        with transaction.atomic():
+            _, per_model = ChatMessage.for_session(session_key).delete()
+        count = per_model.get('myapp.ChatMessage', 0)
 
-        # Limpiar chain en caché
-        if 'retrieval_chain' in request.session:
-            del request.session['retrieval_chain']
-        
-        # Limpiar otros datos de sesión relacionados con el chat
-        if 'chat_context' in request.session:
-            del request.session['chat_context']
+        # El estado del chat vive en ChatMessage (BD) y en las cachés del
+        # proceso, no en la sesión: nada que limpiar aquí y la sesión no
+        # se marca como modificada (se ahorra su UPDATE)
 
-        print(f"🗑️ Sesión {session_key[:8]}... limpiada ({count} mensajes eliminados)", flush=True)
+        logger.info("🗑️ Sesión %s... limpiada (%s mensajes eliminados)", session_key[:8], count)
         
         return JsonResponse({
             'success': True,
@@ -921,7 +1233,7 @@ def clear_chat(request):
         })
         
     except Exception as e:
-        print(f"❌ Error al limpiar chat: {e}", flush=True)
+        logger.exception("❌ Error al limpiar chat: %s", e)
         return JsonResponse({
             'success': False,
             'error': str(e)
@@ -935,9 +1247,6 @@ def test_bot(request):
     Acceder en: http://127.0.0.1:8000/test-bot/
     """
     try:
-        from myapp.services.chat_service import ChatService
-        from myapp.services.vectordb_service import VectorDBService
-        from myapp.services.document_service import DocumentService
         
         results = {
             'chat_service': 'No probado',
@@ -947,42 +1256,44 @@ def test_bot(request):
             'api_key_exists': False,
         }
         
-        # Verificar .env
-        import os
-        from dotenv import load_dotenv
-        load_dotenv()
-        api_key = os.getenv('GOOGLE_API_KEY')
+        # Verificar credenciales: .env ya se parseó al arrancar
+        # (settings.py), este endpoint de salud no toca el disco
+        api_key = settings.GOOGLE_API_KEY
         results['env_loaded'] = True
         results['api_key_exists'] = bool(api_key)
         results['api_key_preview'] = f"{api_key[:10]}..." if api_key else "No existe"
         
         # Probar DocumentService
-        doc_service = DocumentService()
+        doc_service = get_document_service()
         pdf_files = doc_service.get_existing_documents()
         results['document_service'] = f'OK - {len(pdf_files)} PDFs encontrados'
         
-        # Probar VectorDBService
-        vectordb_service = VectorDBService()
-        vectordb = vectordb_service.get_vectorstore(pdf_files, force_regenerate=False)
-        results['vectordb_service'] = 'OK' if vectordb else 'Error: VectorDB es None'
+        # Probar VectorDBService; el resultado se cachea 30 s para que
+        # los sondeos repetidos no re-abran el índice de Chroma: solo el
+        # primer probe de cada ventana paga la carga real
+        vdb_ok = cache.get('vdb_ok')
+        if vdb_ok is None:
+            vectordb_service = get_vectordb_service()
+            vdb_ok = bool(
+                vectordb_service.get_vectorstore(pdf_files, force_regenerate=False)
+            )
+            cache.set('vdb_ok', vdb_ok, 30)
+        results['vectordb_service'] = 'OK' if vdb_ok else 'Error: VectorDB es None'
         
-        # Probar ChatService
-        chat_service = ChatService()
+        # Probar ChatService (singleton compartido)
         results['chat_service'] = 'OK - Servicio inicializado'
         
-        return JsonResponse({
+        return _json_response({
             'success': True,
             'message': 'Prueba completada',
             'results': results
         })
         
     except Exception as e:
-        import traceback
-        return JsonResponse({
-            'success': False,
-            'error': str(e),
-            'trace': traceback.format_exc()
-        }, status=500)
+        payload = {'success': False, 'error': str(e)}
+        if settings.DEBUG:
+            payload['trace'] = traceback.format_exc()
+        return _json_response(payload, status=500)
 
 
 @require_http_methods(["POST", "GET"])
@@ -992,57 +1303,60 @@ def regenerate_vectordb(request):
     Útil cuando se agregan PDFs manualmente a la carpeta docs.
     """
     try:
-        from myapp.services.vectordb_service import VectorDBService
-        from myapp.services.document_service import DocumentService
-        import shutil
         
-        doc_service = DocumentService()
+        doc_service = get_document_service()
+        # Esta vista existe para recoger PDFs añadidos a mano a docs/:
+        # descartar el índice en memoria para que el listado los vea
+        doc_service.invalidate_cache()
         pdf_files = doc_service.get_existing_documents()
         
         # Verificar si hay corpus JSON
-        import os
         json_path = "knowledge_base/corpus_utpl.json"
-        has_corpus = os.path.exists(json_path)
+        has_corpus = get_scraper_service().corpus_exists()
         
         if not pdf_files and not has_corpus:
-            return JsonResponse({
+            return _json_response({
                 'success': False,
                 'error': 'No hay PDFs ni corpus JSON para procesar'
             }, status=400)
-        
-        # Eliminar base vectorial anterior
-        vectordb_dir = "Vector_DB - Documents"
-        if os.path.exists(vectordb_dir):
-            shutil.rmtree(vectordb_dir)
-            print(f"✓ Base vectorial anterior eliminada")
-        
-        # Crear nueva base vectorial
-        vectordb_service = VectorDBService()
-        vectordb = vectordb_service.create_vectorstore(pdf_files, json_path)
-        
-        if vectordb:
-            # Limpiar chain en caché
-            if 'retrieval_chain' in request.session:
-                del request.session['retrieval_chain']
-            
-            return JsonResponse({
-                'success': True,
-                'message': f'Base vectorial regenerada correctamente',
-                'pdf_count': len(pdf_files),
-                'has_corpus': has_corpus,
-                'pdf_files': pdf_files
-            })
-        else:
-            return JsonResponse({
+
+        current = cache.get(VECTORDB_REBUILD_STATUS_KEY)
+        if current and current.get('status') == 'running':
+            return _json_response({
                 'success': False,
-                'error': 'Error al crear la base vectorial'
-            }, status=500)
-    
+                'error': 'Ya hay una reconstrucción en curso'
+            }, status=409)
+
+        # Reconstrucción completa (con intercambio atómico) en un hilo
+        # daemon: un rebuild grande tardaría más que el timeout HTTP, así
+        # que se responde 202 y el avance se consulta en la vista de estado
+        # — mismo patrón que dispatch_scraping
+        dispatch_full_rebuild(json_path)
+
+        return _json_response({
+            'success': True,
+            'message': 'Reconstrucción iniciada en segundo plano',
+            'pdf_count': len(pdf_files),
+            'has_corpus': has_corpus,
+            'pdf_files': pdf_files,
+            'status_url': '/regenerate-vectordb/status/'
+        }, status=202)
+
     except Exception as e:
-        import traceback
-        return JsonResponse({
-            'success': False,
-            'error': str(e),
-            'trace': traceback.format_exc()
-        }, status=500)
+        payload = {'success': False, 'error': str(e)}
+        if settings.DEBUG:
+            payload['trace'] = traceback.format_exc()
+        return _json_response(payload, status=500)
+
+
+def regenerate_vectordb_status(request):
+    """Estado de la última reconstrucción completa (sondeado tras el 202)."""
+    status = cache.get(VECTORDB_REBUILD_STATUS_KEY)
+    if status is None:
+        return JsonResponse({'success': True, 'status': 'idle'})
+    return JsonResponse({
+        'success': True,
+        'finished': status.get('status') in ('success', 'error'),
+        **status,
+    })
 